@@ -1,242 +1,429 @@
+import asyncpg
+import hashlib
 import httpx
 import io
-import json
+import logging
+import orjson
 import os
+import re
 import asyncio
+import tempfile
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any, Callable
-from functools import wraps
-from openai import OpenAI
+from typing import BinaryIO, List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from openai import AsyncOpenAI
+from realtime import AsyncRealtimeClient
+from retries import retry_transient, is_retryable_error
+from logging_config import job_log_context
 from supabase_client import (
-    supabase,
-    update_job_status,
+    jobs_table,
+    SUPABASE_URL,
+    SUPABASE_SERVICE_KEY,
+    claim_pending_job,
+    claim_job,
+    start_job,
+    fail_job,
     update_job_with_results,
     update_job_progress,
     get_audio_chunks,
-    update_chunk_transcript,
-    update_chunks_processed,
-    increment_retry_count
+    finish_chunks,
+    clear_chunk_transcripts,
+    increment_retry_count,
+    get_cached_ai_results,
+    save_ai_results
 )
-from transcribe import transcribe_audio
+from transcribe import transcribe_audio, is_silent
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional (not available on Windows)
+    uvloop = None
+
+logger = logging.getLogger(__name__)
 
 
 # Maximum retry attempts before permanent failure
 MAX_RETRY_ATTEMPTS = 5
 
+# Downloads are spooled in memory up to this size, then spill to a temp file on disk,
+# so per-job memory stays bounded however many jobs run concurrently
+AUDIO_SPOOL_MAX_BYTES = int(os.getenv("AUDIO_SPOOL_MAX_BYTES", str(4 * 1024 * 1024)))
 
-def is_retryable_error(error: Exception) -> bool:
-    """
-    Determine if an error is retryable (transient) or permanent.
+# Read size for streamed downloads (fewer, larger writes into the spool)
+DOWNLOAD_PIECE_BYTES = 1024 * 1024
 
-    Retryable errors include:
-    - Rate limits (429)
-    - Server errors (500, 502, 503, 504)
-    - Timeouts
-    - Connection errors
+# Postgres NOTIFY channel published by the trg_notify_pending_job trigger
+JOBS_CHANNEL = "jobs_pending"
 
-    Permanent errors include:
-    - Invalid audio format
-    - Authentication failures (401, 403)
-    - Bad requests (400)
-    - File not found (404)
+# Job columns read by the listener sweep (get_pending_jobs)
+JOB_COLUMNS = "id,meeting_id,audio_url,language,is_chunked,total_chunks,duration,retry_count,status"
 
-    Args:
-        error: The exception to classify
+# Chunk columns read by process_chunked_job (transcribed/transcript for resume)
+CHUNK_COLUMNS = "id,chunk_index,file_path,duration_seconds,transcribed,transcript"
 
-    Returns:
-        True if the error is retryable, False if permanent
-    """
-    error_str = str(error).lower()
-
-    # Retryable patterns - transient issues that may resolve on retry
-    retryable_patterns = [
-        "rate limit",
-        "rate_limit",
-        "429",
-        "too many requests",
-        "timeout",
-        "timed out",
-        "connection error",
-        "connection refused",
-        "connection reset",
-        "server error",
-        "internal server error",
-        "500",
-        "502",
-        "503",
-        "504",
-        "bad gateway",
-        "service unavailable",
-        "gateway timeout",
-        "temporarily unavailable",
-        "overloaded",
-        "capacity",
-        "try again",
-        "retry",
-        "network",
-        "socket",
-        "eof",
-        "broken pipe",
-    ]
-
-    # Permanent patterns - errors that won't be fixed by retrying
-    permanent_patterns = [
-        "invalid audio",
-        "invalid file",
-        "unsupported format",
-        "could not decode",
-        "authentication",
-        "unauthorized",
-        "401",
-        "forbidden",
-        "403",
-        "not found",
-        "404",
-        "bad request",
-        "400",
-        "invalid_api_key",
-        "api key",
-        "permission denied",
-        "access denied",
-        "file too large",
-        "exceeds maximum",
-    ]
-
-    # Check for permanent errors first (they take priority)
-    for pattern in permanent_patterns:
-        if pattern in error_str:
-            return False
-
-    # Check for retryable errors
-    for pattern in retryable_patterns:
-        if pattern in error_str:
-            return True
+# Maximum number of pending jobs fetched per sweep / claimed per poll
+PENDING_JOBS_BATCH_SIZE = int(os.getenv("PENDING_JOBS_BATCH_SIZE", "50"))
+
+# Maximum number of chunks downloaded + transcribed concurrently per chunked job
+MAX_CONCURRENT_CHUNKS = int(os.getenv("MAX_CONCURRENT_CHUNKS", "5"))
+
+# Maximum number of chunks in flight across all jobs in the process, so several
+# concurrent chunked jobs can't multiply the load on OpenAI and Storage
+GLOBAL_CHUNK_CONCURRENCY = int(os.getenv("GLOBAL_CHUNK_CONCURRENCY", "10"))
 
-    # Default: treat unknown errors as retryable (safer)
-    # This ensures we don't permanently fail on unexpected transient issues
-    return True
+# "fused": one GPT call returns summary + overview + actions (falls back to separate
+# calls if its output is malformed); "separate": summary first, then overview + actions
+AI_GENERATION_MODE = os.getenv("AI_GENERATION_MODE", "fused").lower()
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+# Model per generation task. The summary (and the fused call, which produces it)
+# does the heavy lifting; overview and actions are short outputs derived from the
+# summary and can run on a smaller/cheaper model.
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-5-mini")
+OVERVIEW_MODEL = os.getenv("OVERVIEW_MODEL", "gpt-5-mini")
+ACTIONS_MODEL = os.getenv("ACTIONS_MODEL", "gpt-5-mini")
 
-# Reusable HTTP client for connection pooling
-http_client = httpx.Client(timeout=120.0)
+# Clear audio_chunks.transcript once a chunked job's merged transcript is saved, so
+# the text isn't stored twice. Off by default: the per-chunk helpers in migration
+# 003 (get_merged_transcript, get_meeting_chunks) read those transcripts.
+CLEAR_CHUNK_TRANSCRIPTS = os.getenv("CLEAR_CHUNK_TRANSCRIPTS", "false").lower() == "true"
 
+# Transcripts shorter than this (after stripping) are treated as "no speech" and
+# skip AI generation entirely
+MIN_TRANSCRIPT_CHARS = int(os.getenv("MIN_TRANSCRIPT_CHARS", "50"))
 
-def retry_with_backoff(max_retries: int = 3, base_delay: float = 1.0):
+# Overview stored for jobs whose audio had no usable speech
+NO_SPEECH_OVERVIEW = "(no speech detected)"
+
+# Finished chunk transcripts are saved in batches of this many (plus a final flush)
+CHUNK_FLUSH_SIZE = int(os.getenv("CHUNK_FLUSH_SIZE", "10"))
+
+# Thread pool backing asyncio.to_thread (see use_blocking_pool)
+_blocking_pool: ThreadPoolExecutor = None
+_blocking_pool_loop: asyncio.AbstractEventLoop = None
+
+# Process-wide chunk limiter (see global_chunk_semaphore)
+_chunk_semaphore: asyncio.Semaphore = None
+_chunk_semaphore_loop: asyncio.AbstractEventLoop = None
+
+
+# Reusable async HTTP/2 client shared by storage downloads and GPT calls: requests
+# to the same host reuse keep-alive connections (and multiplex over HTTP/2) instead
+# of paying a TLS handshake each time, and run on the event loop instead of
+# occupying a worker thread. It is bound to the worker's single event loop.
+# Chunked jobs download every chunk from the same storage host through this pool,
+# so idle connections are kept for 5 minutes to span a whole job.
+http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=300.0),
+    timeout=httpx.Timeout(120.0, connect=10.0),
+    follow_redirects=True
+)
+
+# Initialize async OpenAI client on the shared pool (used by all jobs on the worker's
+# event loop). SDK retries are disabled because retry_transient owns the retry
+# policy (otherwise the two layers multiply during an outage); the SDK passes its
+# own per-request timeout, so GPT calls keep 300s instead of the pool's 120s.
+openai_client = AsyncOpenAI(
+    api_key=os.environ.get("OPENAI_API_KEY"),
+    max_retries=0,
+    timeout=httpx.Timeout(300.0, connect=10.0),
+    http_client=http_client
+)
+
+# Service-role auth for direct Supabase Storage REST downloads
+STORAGE_HEADERS = {"apikey": SUPABASE_SERVICE_KEY, "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}"}
+
+# Bucket holding uploaded recordings and their chunks
+RECORDINGS_BUCKET = "recordings"
+
+
+# Supabase Storage object URLs (public, signed or authenticated):
+# <SUPABASE_URL>/storage/v1/object/<public|sign|authenticated>/<bucket>/<path>[?token=...]
+STORAGE_OBJECT_URL_PATTERN = re.compile(r"/storage/v1/object/(?:public/|sign/|authenticated/)?([^/?]+)/([^?]+)")
+
+
+def storage_download_url(audio_url: str) -> Optional[str]:
     """
-    Decorator for retrying functions with exponential backoff
+    Map a Supabase Storage URL of this project to its service-role download endpoint
+
+    Downloading from the object endpoint directly skips the public CDN/redirect hop
+    and works for private buckets and expired signed URLs alike.
 
     Args:
-        max_retries: Maximum number of retry attempts
-        base_delay: Base delay in seconds (doubles each retry)
-    """
-    def decorator(func: Callable):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            last_exception = None
-            for attempt in range(max_retries):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    last_exception = e
-                    if attempt < max_retries - 1:
-                        delay = base_delay * (2 ** attempt)
-                        print(f"   ⚠️ Retry {attempt + 1}/{max_retries} for {func.__name__} after {delay:.1f}s: {e}")
-                        time.sleep(delay)
-                    else:
-                        print(f"   ❌ {func.__name__} failed after {max_retries} attempts: {e}")
-            raise last_exception
-        return wrapper
-    return decorator
+        audio_url: Job audio URL
+
+    Returns:
+        Authenticated object URL, or None if audio_url is not in this project's storage
+    """
+    base_url = SUPABASE_URL.rstrip("/")
+    if not audio_url.startswith(base_url + "/storage/"):
+        return None
+
+    match = STORAGE_OBJECT_URL_PATTERN.match(audio_url, len(base_url))
+    if not match:
+        return None
+
+    bucket, path = match.groups()
+    return storage_object_url(bucket, path)
+
 
+def storage_object_url(bucket: str, path: str) -> str:
+    """Service-role download endpoint for an object in this project's Supabase Storage"""
+    return f"{SUPABASE_URL.rstrip('/')}/storage/v1/object/authenticated/{bucket}/{path}"
 
-def get_pending_jobs() -> List[Dict[str, Any]]:
+
+class ProgressThrottler:
+    """
+    Coalesces update_job_progress writes for a single job
+
+    A write is only sent right away when progress moved by at least min_delta
+    percent or min_interval seconds have passed since the last write; the first
+    report and forced reports always go through. Suppressed reports aren't lost:
+    the latest one is written by a timer once min_interval has passed, so the
+    stored progress trails the real one by at most min_interval. Safe to call
+    from transcription threads. Call close()/aclose() before the job's final
+    status write so a trailing update can't land after it.
+    """
+
+    def __init__(self, job_id: str, min_delta: int = 5, min_interval: float = 1.0):
+        self.job_id = job_id
+        self.min_delta = min_delta
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        # Serializes progress writes so a trailing write can't overtake a newer one
+        self._write_lock = threading.Lock()
+        self._last_progress = None
+        self._last_sent_at = 0.0
+        self._pending = None
+        self._timer = None
+        self._closed = False
+
+    def _should_send(self, progress: int, stage: str, force: bool) -> bool:
+        with self._lock:
+            if self._closed:
+                return False
+            now = time.monotonic()
+            if not force and self._last_progress is not None:
+                if (abs(progress - self._last_progress) < self.min_delta
+                        and now - self._last_sent_at < self.min_interval):
+                    # Keep only the latest suppressed report for the trailing write
+                    self._pending = (progress, stage)
+                    if self._timer is None:
+                        delay = self.min_interval - (now - self._last_sent_at)
+                        self._timer = threading.Timer(delay, self._flush_pending)
+                        self._timer.daemon = True
+                        self._timer.start()
+                    return False
+            self._pending = None
+            self._last_progress = progress
+            self._last_sent_at = now
+            return True
+
+    def _write(self, progress: int, stage: str):
+        with self._write_lock:
+            update_job_progress(self.job_id, progress, stage)
+
+    def _flush_pending(self):
+        """Timer callback: write the latest suppressed report, if still wanted"""
+        with self._write_lock:
+            with self._lock:
+                self._timer = None
+                pending, self._pending = self._pending, None
+                if self._closed or pending is None:
+                    return
+                self._last_progress = pending[0]
+                self._last_sent_at = time.monotonic()
+            try:
+                update_job_progress(self.job_id, *pending)
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to write progress for job {self.job_id}: {e}")
+
+    def mark_sent(self, progress: int):
+        """Record progress that was written by another call (e.g. start_job)"""
+        self._should_send(progress, "", force=True)
+
+    def report(self, progress: int, stage: str, force: bool = False):
+        """Blocking report, for use from worker threads (e.g. transcription callbacks)"""
+        if self._should_send(progress, stage, force):
+            self._write(progress, stage)
+
+    async def areport(self, progress: int, stage: str, force: bool = False):
+        """Report from the event loop; skipped updates never touch a thread"""
+        if self._should_send(progress, stage, force):
+            await asyncio.to_thread(self._write, progress, stage)
+
+    def close(self):
+        """Drop any pending trailing write and wait for one in flight"""
+        with self._lock:
+            self._closed = True
+            self._pending = None
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        with self._write_lock:
+            pass
+
+    async def aclose(self):
+        """close() from the event loop"""
+        await asyncio.to_thread(self.close)
+
+
+def get_pending_jobs(limit: int = PENDING_JOBS_BATCH_SIZE) -> List[Dict[str, Any]]:
     """
-    Query Supabase for all jobs with status='pending'
+    Query Supabase for the oldest jobs with status='pending'
+
+    Only the columns the processors read are fetched (JOB_COLUMNS), so rows
+    carrying large transcripts or summaries don't bloat the response.
+
+    Args:
+        limit: Maximum number of jobs to return (the rest are picked up next run)
 
     Returns:
         List of pending job dictionaries
     """
     try:
-        response = supabase.table("transcription_jobs").select("*").eq("status", "pending").execute()
+        response = (
+            jobs_table
+            .select(JOB_COLUMNS)
+            .eq("status", "pending")
+            .order("created_at")
+            .limit(limit)
+            .execute()
+        )
 
         if response.data:
-            print(f"📋 Found {len(response.data)} pending job(s)")
+            logger.info(f"📋 Found {len(response.data)} pending job(s)")
             return response.data
         else:
-            print("✨ No pending jobs")
+            logger.info("✨ No pending jobs")
             return []
     except Exception as e:
-        print(f"❌ Error fetching pending jobs: {e}")
+        logger.error(f"❌ Error fetching pending jobs: {e}")
         return []
 
 
-def download_audio(audio_url: str) -> bytes:
+@retry_transient()
+async def download_audio(audio_url: str) -> BinaryIO:
     """
-    Download audio file from URL using reusable HTTP client for connection pooling
+    Stream audio file from URL into a spooled temp file using the reusable HTTP client
+
+    The body is written in DOWNLOAD_PIECE_BYTES pieces, so peak memory is bounded by
+    AUDIO_SPOOL_MAX_BYTES regardless of recording length; the returned file
+    object is handed straight to transcribe_audio (no second in-memory copy).
 
     Args:
         audio_url: URL to audio file (Supabase Storage or public URL)
 
     Returns:
-        Audio file bytes
+        Seekable file object positioned at the start of the audio (caller closes it)
 
     Raises:
         Exception: If download fails
     """
-    print(f"   📥 Downloading audio from {audio_url[:50]}...")
+    logger.info(f"📥 Downloading audio from {audio_url[:50]}...")
+
+    # Files in our own Supabase Storage are fetched straight from the object
+    # endpoint with the service key; anything else is a plain GET
+    headers = None
+    storage_url = storage_download_url(audio_url)
+    if storage_url:
+        audio_url = storage_url
+        headers = STORAGE_HEADERS
+
+    spool = tempfile.SpooledTemporaryFile(max_size=AUDIO_SPOOL_MAX_BYTES)
+    try:
+        async with http_client.stream("GET", audio_url, headers=headers) as response:
+            response.raise_for_status()
+            async for piece in response.aiter_bytes(DOWNLOAD_PIECE_BYTES):
+                spool.write(piece)
+    except Exception:
+        spool.close()
+        raise
 
-    response = http_client.get(audio_url, follow_redirects=True)
-    response.raise_for_status()
+    logger.info(f"✅ Downloaded {spool.tell()} bytes")
+    spool.seek(0)
+    return spool
 
-    print(f"   ✅ Downloaded {len(response.content)} bytes")
-    return response.content
 
+# Prompts are module constants so every request starts with byte-identical
+# system messages: static instructions first, the variable meeting text last,
+# which keeps the shared prefix eligible for OpenAI's automatic prompt caching.
+# Prefixes are tuples of prebuilt messages shared by every call; only the user
+# message is allocated per request.
 
-@retry_with_backoff(max_retries=3, base_delay=1.0)
-def generate_overview(summary: str) -> str:
-    """Generate 1-sentence meeting overview using GPT-5-mini from summary"""
-    print(f"   📝 Generating overview from summary...")
+OVERVIEW_PROMPT_PREFIX = (
+    {
+        "role": "system",
+        "content": """You create concise one-sentence meeting overviews. Always respond with exactly one clear, informative sentence in the same language as the input transcript.
 
-    prompt = f"""Identify the language spoken and always respond in the same language as the input.
-Summarize this meeting summary in exactly one short, clear sentence. Capture the main topic and key outcome or focus of the meeting.
+Identify the language spoken and always respond in the same language as the input.
+Summarize the meeting summary you are given in exactly one short, clear sentence. Capture the main topic and key outcome or focus of the meeting.
 
 Examples:
 - "Team discussed Q4 goals and assigned project leads for upcoming initiatives."
 - "Budget review meeting where department heads presented spending proposals."
-- "Weekly standup covering project progress and addressing technical blockers."
+- "Weekly standup covering project progress and addressing technical blockers.\""""
+    },
+)
+OVERVIEW_INPUT_PREFIX = "Meeting Summary: "
 
-Meeting Summary: {summary}"""
+SUMMARY_PROMPT_PREFIX = (
+    {
+        "role": "system",
+        "content": """You are a professional meeting summarizer. Create structured, comprehensive summaries that capture key decisions, action items, and next steps. Always respond in the same language as the input transcript.
 
-    response = openai_client.responses.create(
-        model="gpt-5-mini",
-        input=[
-            {"role": "system", "content": "You create concise one-sentence meeting overviews. Always respond with exactly one clear, informative sentence in the same language as the input transcript."},
-            {"role": "user", "content": prompt}
-        ],
-        reasoning={"effort": "minimal"},
-        text={"verbosity": "low"}
-    )
+Identify the language spoken and always respond in the same language as the input transcript.
+Please create a comprehensive meeting summary from the transcript you are given. Structure your response with the following sections:
 
-    # Find the message output (reasoning output doesn't have content)
-    message_output = next((item for item in response.output if item.type == "message"), None)
-    if not message_output or not message_output.content:
-        raise Exception("No message content in response")
+## Key Discussion Points
+- Main topics discussed
+- Important insights shared
 
-    overview = message_output.content[0].text.strip()
-    print(f"   ✅ Overview generated: {overview[:80]}...")
-    return overview
+## Decisions Made
+- Key decisions reached during the meeting
+- Who is responsible for what
 
+## Action Items
+- Tasks assigned with responsible parties
+- Deadlines mentioned
 
-@retry_with_backoff(max_retries=3, base_delay=1.0)
-def generate_summary(transcript: str) -> str:
-    """Generate comprehensive meeting summary using GPT-5-mini"""
-    print(f"   📄 Generating summary...")
+## Next Steps
+- Follow-up actions
+- Future meetings or milestones"""
+    },
+)
+SUMMARY_INPUT_PREFIX = "Meeting Transcript: "
+
+ACTIONS_PROMPT_PREFIX = (
+    {
+        "role": "system",
+        "content": """You extract actionable items from text and return them as JSON. Be precise and only return valid JSON. Always use the same language as the input transcript for action descriptions.
 
-    prompt = f"""Identify the language spoken and always respond in the same language as the input transcript.
-Please create a comprehensive meeting summary from this transcript. Structure your response with the following sections:
+Identify the language spoken and always respond in the same language as the input.
+Extract actionable items from the meeting summary you are given. For each action item, provide:
+1. A clear, concise action description
+2. Priority level (HIGH, MED, LOW)
+
+Return ONLY a JSON object with this exact format:
+{"actions": [{"action": "action description", "priority": "HIGH|MED|LOW"}]}
+
+If no actionable items exist, return an empty list: {"actions": []}"""
+    },
+)
+ACTIONS_INPUT_PREFIX = "Meeting Summary: "
+
+FUSED_PROMPT_PREFIX = (
+    {
+        "role": "system",
+        "content": """You are a professional meeting summarizer. From a meeting transcript you produce a structured summary, a one-sentence overview and a list of action items, returned together as JSON. Be precise and only return valid JSON.
+
+Identify the language spoken and always respond in the same language as the input transcript, for every field.
+
+Return ONLY a JSON object with this exact format:
+{"summary": "...", "overview": "...", "actions": [{"action": "action description", "priority": "HIGH|MED|LOW"}]}
+
+"summary": a comprehensive markdown meeting summary with the following sections:
 
 ## Key Discussion Points
 - Main topics discussed
@@ -254,125 +441,354 @@ Please create a comprehensive meeting summary from this transcript. Structure yo
 - Follow-up actions
 - Future meetings or milestones
 
-Meeting Transcript: {transcript}"""
+"overview": exactly one short, clear sentence capturing the main topic and key outcome or focus of the meeting. Examples:
+- "Team discussed Q4 goals and assigned project leads for upcoming initiatives."
+- "Budget review meeting where department heads presented spending proposals."
+- "Weekly standup covering project progress and addressing technical blockers."
+
+"actions": the actionable items from the meeting, each with a clear, concise action description and a priority level (HIGH, MED, LOW). If no actionable items exist, use an empty list: []"""
+    },
+)
+FUSED_INPUT_PREFIX = "Meeting Transcript: "
+
+# Structured-output schemas: with strict json_schema the model can only emit
+# objects of this exact shape, so the action list and fused fields always parse
+ACTION_ITEMS_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "action": {"type": "string"},
+            "priority": {"type": "string", "enum": ["HIGH", "MED", "LOW"]}
+        },
+        "required": ["action", "priority"],
+        "additionalProperties": False
+    }
+}
+
+ACTIONS_FORMAT = {
+    "type": "json_schema",
+    "name": "meeting_actions",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {"actions": ACTION_ITEMS_SCHEMA},
+        "required": ["actions"],
+        "additionalProperties": False
+    }
+}
+
+FUSED_FORMAT = {
+    "type": "json_schema",
+    "name": "meeting_analysis",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "summary": {"type": "string"},
+            "overview": {"type": "string"},
+            "actions": ACTION_ITEMS_SCHEMA
+        },
+        "required": ["summary", "overview", "actions"],
+        "additionalProperties": False
+    }
+}
+
+
+def log_usage(call_name: str, response) -> None:
+    """
+    Log token usage for a GPT call, including how much of the prompt was a cache hit
+
+    OpenAI only caches prompt prefixes of 1024+ tokens, so cached_tokens stays 0
+    for short prompts; a non-zero value confirms the static prefix is being reused.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+
+    details = getattr(usage, "input_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    logger.info(
+        f"📊 {call_name}: {usage.input_tokens} input tokens ({cached_tokens} cached), "
+        f"{usage.output_tokens} output tokens"
+    )
+
+
+def user_message(prefix: str, text: str) -> Dict[str, Any]:
+    """
+    Build a user message with the static prefix and the meeting text as separate parts
+
+    Avoids concatenating the prefix onto a potentially multi-megabyte transcript,
+    which would allocate and copy a second full-size string for every call.
+    """
+    return {
+        "role": "user",
+        "content": [
+            {"type": "input_text", "text": prefix},
+            {"type": "input_text", "text": text}
+        ]
+    }
+
 
-    response = openai_client.responses.create(
-        model="gpt-5-mini",
-        input=[
-            {"role": "system", "content": "You are a professional meeting summarizer. Create structured, comprehensive summaries that capture key decisions, action items, and next steps. Always respond in the same language as the input transcript."},
-            {"role": "user", "content": prompt}
-        ],
+def message_text(response) -> str:
+    """
+    Return the text of the first message item in a Responses API result
+
+    Reasoning items come first and carry no content, so they are skipped.
+
+    Raises:
+        ValueError: If the response has no message content
+    """
+    for item in response.output:
+        if item.type == "message" and item.content:
+            return item.content[0].text
+    raise ValueError("No message content in response")
+
+
+@retry_transient()
+async def generate_overview(summary: str) -> str:
+    """Generate 1-sentence meeting overview from summary using OVERVIEW_MODEL"""
+    logger.info("📝 Generating overview from summary...")
+
+    response = await openai_client.responses.create(
+        model=OVERVIEW_MODEL,
+        input=OVERVIEW_PROMPT_PREFIX + (user_message(OVERVIEW_INPUT_PREFIX, summary),),
         reasoning={"effort": "minimal"},
         text={"verbosity": "low"}
     )
+    log_usage("generate_overview", response)
 
-    # Find the message output (reasoning output doesn't have content)
-    message_output = next((item for item in response.output if item.type == "message"), None)
-    if not message_output or not message_output.content:
-        raise Exception("No message content in response")
-
-    summary = message_output.content[0].text
-    print(f"   ✅ Summary generated ({len(summary)} chars)")
-    return summary
+    overview = message_text(response).strip()
+    logger.info(f"✅ Overview generated: {overview[:80]}...")
+    return overview
 
 
-@retry_with_backoff(max_retries=3, base_delay=1.0)
-def extract_actions(summary: str) -> list:
-    """Extract action items from summary using GPT-5-mini"""
-    print(f"   ✅ Extracting actions from summary...")
+@retry_transient()
+async def generate_summary(transcript: str) -> str:
+    """Generate comprehensive meeting summary using SUMMARY_MODEL"""
+    logger.info("📄 Generating summary...")
 
-    prompt = f"""Identify the language spoken and always respond in the same language as the input.
-Extract actionable items from this meeting summary. For each action item, provide:
-1. A clear, concise action description
-2. Priority level (HIGH, MED, LOW)
+    response = await openai_client.responses.create(
+        model=SUMMARY_MODEL,
+        input=SUMMARY_PROMPT_PREFIX + (user_message(SUMMARY_INPUT_PREFIX, transcript),),
+        reasoning={"effort": "minimal"},
+        text={"verbosity": "low"}
+    )
+    log_usage("generate_summary", response)
 
-Return ONLY a JSON array with this exact format:
-[{{"action": "action description", "priority": "HIGH|MED|LOW"}}]
+    summary = message_text(response)
+    logger.info(f"✅ Summary generated ({len(summary)} chars)")
+    return summary
 
-If no actionable items exist, return an empty array: []
 
-Meeting Summary: {summary}"""
+@retry_transient()
+async def extract_actions(summary: str) -> list:
+    """Extract action items from summary using ACTIONS_MODEL"""
+    logger.info("✅ Extracting actions from summary...")
 
-    response = openai_client.responses.create(
-        model="gpt-5-mini",
-        input=[
-            {"role": "system", "content": "You extract actionable items from text and return them as JSON. Be precise and only return valid JSON. Always use the same language as the input transcript for action descriptions."},
-            {"role": "user", "content": prompt}
-        ],
-        reasoning={"effort": "minimal"}
+    response = await openai_client.responses.create(
+        model=ACTIONS_MODEL,
+        input=ACTIONS_PROMPT_PREFIX + (user_message(ACTIONS_INPUT_PREFIX, summary),),
+        reasoning={"effort": "minimal"},
+        # Structured output guarantees a bare {"actions": [...]} object
+        text={"format": ACTIONS_FORMAT}
     )
+    log_usage("extract_actions", response)
 
+    actions_text = ""
     try:
-        # Find the message output (reasoning output doesn't have content)
-        message_output = next((item for item in response.output if item.type == "message"), None)
-        if not message_output or not message_output.content:
-            raise Exception("No message content in response")
-
-        actions_text = message_output.content[0].text.strip()
-
-        # Extract JSON from markdown code blocks if present
-        if "```json" in actions_text:
-            # Extract content between ```json and ```
-            start = actions_text.find("```json") + 7
-            end = actions_text.find("```", start)
-            actions_text = actions_text[start:end].strip()
-        elif "```" in actions_text:
-            # Extract content between ``` and ```
-            start = actions_text.find("```") + 3
-            end = actions_text.find("```", start)
-            actions_text = actions_text[start:end].strip()
-
-        # Try to parse the JSON
-        actions = json.loads(actions_text)
+        actions_text = message_text(response)
+        actions = orjson.loads(actions_text).get("actions")
 
         # Validate it's a list
         if not isinstance(actions, list):
-            print(f"   ⚠️  GPT returned non-list JSON: {type(actions)}, returning empty array")
+            logger.warning(f"⚠️  GPT returned non-list actions: {type(actions)}, returning empty array")
             return []
 
-        print(f"   ✅ Actions extracted: {len(actions)} items")
+        logger.info(f"✅ Actions extracted: {len(actions)} items")
         return actions
 
-    except json.JSONDecodeError as e:
-        print(f"   ⚠️  Failed to parse actions JSON: {e}")
-        print(f"   📝 GPT response was: {response.choices[0].message.content[:200]}")
+    except orjson.JSONDecodeError as e:
+        logger.warning(f"⚠️  Failed to parse actions JSON: {e}")
+        logger.warning(f"📝 GPT response was: {actions_text[:200]}")
         return []
     except Exception as e:
-        print(f"   ⚠️  Unexpected error extracting actions: {e}")
+        logger.warning(f"⚠️  Unexpected error extracting actions: {e}")
         return []
 
 
-def download_chunk_from_storage(chunk_file_path: str) -> bytes:
+@retry_transient()
+async def generate_all(transcript: str) -> tuple[str, str, list]:
+    """
+    Generate summary, overview and actions in a single SUMMARY_MODEL call
+
+    The transcript is sent once and all three deliverables come back in one JSON
+    object (constrained by FUSED_FORMAT), instead of a summary call followed by
+    overview + actions calls.
+
+    Returns:
+        Tuple of (summary, overview, actions)
+
+    Raises:
+        ValueError: If the response is not the expected JSON object
+    """
+    logger.info("🧩 Generating summary, overview and actions in one call...")
+
+    response = await openai_client.responses.create(
+        model=SUMMARY_MODEL,
+        input=FUSED_PROMPT_PREFIX + (user_message(FUSED_INPUT_PREFIX, transcript),),
+        reasoning={"effort": "minimal"},
+        # Structured output guarantees the summary/overview/actions object
+        text={"format": FUSED_FORMAT}
+    )
+    log_usage("generate_all", response)
+
+    try:
+        result = orjson.loads(message_text(response))
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in fused response: {e}") from e
+
+    summary = result.get("summary") if isinstance(result, dict) else None
+    overview = result.get("overview") if isinstance(result, dict) else None
+    actions = result.get("actions") if isinstance(result, dict) else None
+    if not isinstance(summary, str) or not isinstance(overview, str) or not isinstance(actions, list):
+        raise ValueError("Fused response is missing summary, overview or actions")
+
+    summary = summary.strip()
+    overview = overview.strip()
+    logger.info(f"✅ Generated summary ({len(summary)} chars), overview and {len(actions)} actions")
+    return summary, overview, actions
+
+
+def _transcript_key(transcript: str) -> str:
+    """Content-addressed cache key for a transcript"""
+    return hashlib.blake2b(transcript.encode(), digest_size=16).hexdigest()
+
+
+async def generate_ai_content(
+    progress: ProgressThrottler,
+    transcript: str,
+    start_progress: int,
+    summary_progress: int
+) -> tuple[str, str, list]:
+    """
+    Generate summary, overview and actions for a transcript
+
+    Results are cached by transcript hash, so a retried or duplicate job with the
+    same transcript skips the GPT calls entirely. With AI_GENERATION_MODE=fused (the
+    default) everything comes from one generate_all call; if that response is
+    malformed, or with AI_GENERATION_MODE=separate, the summary is generated first
+    and overview + actions are derived from it. Transcripts shorter than
+    MIN_TRANSCRIPT_CHARS (silence, failed audio) skip generation and get a
+    placeholder overview, an empty summary and no actions.
+
+    Args:
+        progress: Progress reporter for the job
+        transcript: Full meeting transcript
+        start_progress: Progress percentage when summary generation starts
+        summary_progress: Progress percentage once the summary is ready
+
+    Returns:
+        Tuple of (summary, overview, actions)
+    """
+    if len(transcript.strip()) < MIN_TRANSCRIPT_CHARS:
+        logger.info(f"🔇 Transcript is {len(transcript.strip())} chars, skipping AI generation")
+        return "", NO_SPEECH_OVERVIEW, []
+
+    transcript_key = _transcript_key(transcript)
+
+    cached = await asyncio.to_thread(get_cached_ai_results, transcript_key)
+    if cached:
+        logger.info(f"♻️  Reusing cached AI content for transcript {transcript_key}")
+        return cached["summary"], cached["overview"], cached["actions"]
+
+    if AI_GENERATION_MODE == "fused":
+        await progress.areport(start_progress, "Generating summary, overview and actions...")
+        try:
+            summary, overview, actions = await generate_all(transcript)
+        except ValueError as e:
+            logger.warning(f"⚠️  Fused generation returned unusable output, generating separately: {e}")
+        else:
+            await asyncio.to_thread(save_ai_results, transcript_key, summary, overview, actions)
+            return summary, overview, actions
+
+    # Summary - needs full transcript, must run first
+    await progress.areport(start_progress, "Generating summary...")
+    summary = await generate_summary(transcript)
+
+    # Overview + Actions in PARALLEL - both only need summary
+    logger.info("🚀 Generating overview and actions in parallel...")
+    await progress.areport(summary_progress, "Generating overview and extracting actions...")
+
+    overview, actions = await asyncio.gather(
+        generate_overview(summary),
+        extract_actions(summary)
+    )
+
+    await asyncio.to_thread(save_ai_results, transcript_key, summary, overview, actions)
+    return summary, overview, actions
+
+
+@retry_transient()
+async def download_chunk_from_storage(chunk_file_path: str) -> bytes:
     """
     Download a single chunk from Supabase Storage
 
+    Goes straight to the Storage REST endpoint through the shared http_client, so
+    all chunks of a job reuse the same pooled HTTP/2 connections.
+
     Args:
         chunk_file_path: File path in storage (e.g., "userId/meetingId_chunk_0.m4a")
 
     Returns:
-        Audio chunk bytes
+        Audio chunk bytes (bytes, not a bytearray, so the upload, probe and
+        silence check can all use them without copying)
 
     Raises:
         Exception: If download fails
     """
     try:
-        print(f"   📥 Downloading chunk: {chunk_file_path}")
+        logger.info(f"📥 Downloading chunk: {chunk_file_path}")
 
-        # Download from Supabase Storage using service key
-        response = supabase.storage.from_("recordings").download(chunk_file_path)
+        # Download from Supabase Storage using service key, streaming the pieces
+        # and joining them into bytes once at the end. Not a preallocated
+        # bytearray: the upload and silence check only avoid copies for bytes,
+        # and bytes(bytearray) costs the same extra copy as the join. Chunks are
+        # at most a few MB, so the transient second copy doesn't matter
+        url = storage_object_url(RECORDINGS_BUCKET, chunk_file_path)
+        async with http_client.stream("GET", url, headers=STORAGE_HEADERS) as response:
+            response.raise_for_status()
+            data = b"".join([piece async for piece in response.aiter_bytes(DOWNLOAD_PIECE_BYTES)])
 
-        print(f"   ✅ Downloaded chunk: {len(response)} bytes")
-        return response
+        logger.info(f"✅ Downloaded chunk: {len(data)} bytes")
+        return data
 
     except Exception as e:
-        print(f"   ❌ Failed to download chunk {chunk_file_path}: {e}")
+        logger.error(f"❌ Failed to download chunk {chunk_file_path}: {e}")
         raise
 
 
-def process_single_chunk(chunk: Dict[str, Any], total_chunks: int, language: str = None) -> Dict[str, Any]:
+def global_chunk_semaphore() -> asyncio.Semaphore:
+    """
+    Return the semaphore limiting chunks in flight across all jobs to GLOBAL_CHUNK_CONCURRENCY
+
+    Like the blocking pool it belongs to the running loop, and is recreated if a
+    new loop takes over.
+    """
+    global _chunk_semaphore, _chunk_semaphore_loop
+
+    loop = asyncio.get_running_loop()
+    if _chunk_semaphore_loop is not loop:
+        _chunk_semaphore = asyncio.Semaphore(GLOBAL_CHUNK_CONCURRENCY)
+        _chunk_semaphore_loop = loop
+    return _chunk_semaphore
+
+
+async def process_single_chunk(chunk: Dict[str, Any], total_chunks: int, language: str = None) -> Dict[str, Any]:
     """
     Process a single audio chunk: download and transcribe.
-    Used by ThreadPoolExecutor for parallel processing.
+    The download runs on the event loop and blocking Whisper calls in worker
+    threads, so chunks overlap.
 
     Args:
         chunk: Chunk dictionary with id, chunk_index, file_path
@@ -388,14 +804,23 @@ def process_single_chunk(chunk: Dict[str, Any], total_chunks: int, language: str
 
     try:
         # Download chunk from storage
-        chunk_data = download_chunk_from_storage(file_path)
+        chunk_data = await download_chunk_from_storage(file_path)
 
-        # Transcribe chunk
-        print(f"   🎤 Transcribing chunk {chunk_index + 1}/{total_chunks}...")
-        result = transcribe_audio(chunk_data, f"chunk_{chunk_index}.m4a", language=language)
-        transcript = result["transcript"]
+        chunk_name = f"chunk_{chunk_index}.m4a"
+
+        # Silent chunks (leading/trailing silence, long pauses) skip the Whisper round-trip
+        if await asyncio.to_thread(is_silent, chunk_data, chunk_name):
+            logger.info(f"🔇 Chunk {chunk_index + 1}/{total_chunks} is silent, skipping transcription")
+            transcript = ""
+        else:
+            # Transcribe chunk
+            logger.info(f"🎤 Transcribing chunk {chunk_index + 1}/{total_chunks}...")
+            result = await asyncio.to_thread(
+                transcribe_audio, chunk_data, chunk_name, language=language
+            )
+            transcript = result["transcript"]
 
-        print(f"   ✅ Chunk {chunk_index + 1}/{total_chunks} transcribed ({len(transcript)} chars)")
+        logger.info(f"✅ Chunk {chunk_index + 1}/{total_chunks} transcribed ({len(transcript)} chars)")
 
         return {
             "chunk_id": chunk_id,
@@ -403,14 +828,18 @@ def process_single_chunk(chunk: Dict[str, Any], total_chunks: int, language: str
             "transcript": transcript
         }
     except Exception as e:
-        print(f"   ❌ Chunk {chunk_index + 1}/{total_chunks} failed: {e}")
+        logger.error(f"❌ Chunk {chunk_index + 1}/{total_chunks} failed: {e}")
         raise
 
 
-def process_chunked_job(job: Dict[str, Any]):
+async def process_chunked_job(job: Dict[str, Any]):
     """
     Process a chunked transcription job
 
+    Chunks are downloaded and transcribed concurrently (bounded by
+    MAX_CONCURRENT_CHUNKS per job and GLOBAL_CHUNK_CONCURRENCY per process), so
+    storage downloads overlap in-flight Whisper requests.
+
     Args:
         job: Job dictionary from Supabase
     """
@@ -418,110 +847,145 @@ def process_chunked_job(job: Dict[str, Any]):
     meeting_id = job["meeting_id"]
     total_chunks = job.get("total_chunks", 0)
     language = job.get("language")  # None if not specified (auto-detect)
+    progress = ProgressThrottler(job_id)
 
     try:
-        # Step 1: Update status to 'processing'
-        print(f"   📦 Processing chunked job ({total_chunks} chunks)...")
-        update_job_status(job_id, "processing")
-        update_job_progress(job_id, 0, "Starting chunked transcription...")
-
-        # Step 2: Fetch all audio chunks from database
-        print(f"   📋 Fetching audio chunks from database...")
-        update_job_progress(job_id, 5, "Fetching audio chunks...")
-        chunks = get_audio_chunks(meeting_id)
+        # Step 1+2: Update status to 'processing' and fetch all audio chunks
+        # These are independent round-trips, so they run concurrently
+        logger.info(f"📦 Processing chunked job ({total_chunks} chunks)...")
+        logger.info("📋 Fetching audio chunks from database...")
+        progress.mark_sent(5)
+        _, chunks = await asyncio.gather(
+            asyncio.to_thread(start_job, job_id, 5, "Fetching audio chunks..."),
+            asyncio.to_thread(get_audio_chunks, meeting_id, CHUNK_COLUMNS)
+        )
 
         if not chunks:
             raise Exception(f"No audio chunks found for meeting {meeting_id}")
 
         if len(chunks) != total_chunks:
-            print(f"   ⚠️ Expected {total_chunks} chunks, found {len(chunks)}")
-
-        # Step 3: Process chunks in PARALLEL (5-70% total progress)
-        # Using ThreadPoolExecutor for 5-10x speedup on chunked jobs
-        print(f"   🚀 Processing {len(chunks)} chunks in parallel (max 5 workers)...")
-        update_job_progress(job_id, 10, f"Transcribing {len(chunks)} chunks in parallel...")
-
-        # Track results by chunk_index to maintain order
-        chunk_results: Dict[int, str] = {}
-        completed_count = 0
-
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            # Submit all chunks for parallel processing
-            future_to_chunk = {
-                executor.submit(process_single_chunk, chunk, len(chunks), language): chunk
-                for chunk in chunks
-            }
-
+            logger.warning(f"⚠️ Expected {total_chunks} chunks, found {len(chunks)}")
+
+        # Step 3: Process chunks CONCURRENTLY (5-70% total progress)
+        # Each chunk is a download -> transcribe -> save pipeline gated by a semaphore
+        logger.info(f"🚀 Processing {len(chunks)} chunks concurrently (max {MAX_CONCURRENT_CHUNKS} at a time)...")
+        await progress.areport(10, f"Transcribing {len(chunks)} chunks in parallel...")
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+        shared_semaphore = global_chunk_semaphore()
+
+        async def handle_chunk(chunk: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore, shared_semaphore:
+                return await process_single_chunk(chunk, len(chunks), language)
+
+        # Transcripts are written to the buffer in chunk_index order as soon as the
+        # next expected chunk is done; only out-of-order results wait in `pending`
+        transcript_buffer = io.StringIO()
+        chunk_order = sorted(chunk["chunk_index"] for chunk in chunks)
+        next_position = 0
+        pending: Dict[int, str] = {}
+        finished_chunks: List[Dict[str, str]] = []
+
+        def write_ready_transcripts():
+            """Write every transcript that is now contiguous with what's written"""
+            nonlocal next_position
+            while next_position < len(chunk_order) and chunk_order[next_position] in pending:
+                if next_position:
+                    transcript_buffer.write("\n")
+                transcript_buffer.write(pending.pop(chunk_order[next_position]))
+                next_position += 1
+
+        # Resume: chunks already transcribed by an earlier (failed) attempt of this
+        # job are reused instead of being downloaded and transcribed again
+        remaining_chunks = []
+        for chunk in chunks:
+            if chunk.get("transcribed") and chunk.get("transcript") is not None:
+                pending[chunk["chunk_index"]] = chunk["transcript"]
+            else:
+                remaining_chunks.append(chunk)
+        write_ready_transcripts()
+        completed_count = len(chunks) - len(remaining_chunks)
+        if completed_count:
+            logger.info(f"♻️  Resuming: {completed_count}/{len(chunks)} chunks already transcribed")
+
+        async def flush_finished_chunks(stage: Optional[str] = None):
+            """Save buffered chunk transcripts + chunk count + progress in one round-trip"""
+            if not finished_chunks:
+                return
+            current_progress = 5 + int((completed_count / len(chunks)) * 65)
+            await asyncio.to_thread(
+                finish_chunks,
+                job_id,
+                list(finished_chunks),
+                completed_count,
+                current_progress,
+                stage or f"Transcribed {completed_count}/{len(chunks)} chunks..."
+            )
+            finished_chunks.clear()
+
+        tasks = [asyncio.create_task(handle_chunk(chunk)) for chunk in remaining_chunks]
+        try:
             # Process completed chunks as they finish
-            for future in as_completed(future_to_chunk):
-                chunk = future_to_chunk[future]
-                try:
-                    result = future.result()
-                    chunk_id = result["chunk_id"]
-                    chunk_index = result["chunk_index"]
-                    transcript = result["transcript"]
-
-                    # Save transcript to database
-                    update_chunk_transcript(chunk_id, transcript)
-
-                    # Store result by index for ordered merging later
-                    chunk_results[chunk_index] = transcript
-
-                    # Update progress
-                    completed_count += 1
-                    current_progress = 5 + int((completed_count / len(chunks)) * 65)
-                    update_job_progress(
-                        job_id,
-                        current_progress,
-                        f"Transcribed {completed_count}/{len(chunks)} chunks..."
-                    )
-                    update_chunks_processed(job_id, completed_count)
-
-                except Exception as e:
-                    chunk_index = chunk.get("chunk_index", "?")
-                    print(f"   ❌ Chunk {chunk_index} failed: {e}")
-                    raise
-
-        # Build ordered transcripts list from results
-        transcripts = [chunk_results[i] for i in sorted(chunk_results.keys())]
-        print(f"   ✅ All {len(transcripts)} chunks transcribed in parallel")
-
-        # Step 4: Merge transcripts (70%)
-        print(f"   🔗 Merging {len(transcripts)} chunk transcripts...")
-        update_job_progress(job_id, 70, "Merging transcripts...")
-        full_transcript = "\n".join(transcripts)
-        print(f"   ✅ Merged transcript: {len(full_transcript)} chars")
+            for next_completed in asyncio.as_completed(tasks):
+                result = await next_completed
+
+                pending[result["chunk_index"]] = result["transcript"]
+                write_ready_transcripts()
+
+                # Buffer the chunk transcript; saved with the job's count/progress
+                # every CHUNK_FLUSH_SIZE chunks
+                completed_count += 1
+                finished_chunks.append({"id": result["chunk_id"], "transcript": result["transcript"]})
+                if len(finished_chunks) >= CHUNK_FLUSH_SIZE:
+                    await flush_finished_chunks()
+        except Exception:
+            # Fail fast: stop any chunks still in flight
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            # Keep the transcripts we already paid for (best-effort)
+            try:
+                await flush_finished_chunks()
+            except Exception as flush_error:
+                logger.warning(f"⚠️  Failed to save finished chunks: {flush_error}")
+            raise
+
+        logger.info(f"✅ All {completed_count} chunks transcribed in parallel")
+
+        # The last batch of chunk transcripts is saved while the AI content is
+        # generated. It already reports the AI stage, so the flush and the first
+        # AI progress write agree whichever lands last.
+        final_flush = asyncio.create_task(flush_finished_chunks("Generating AI content..."))
+
+        # Step 4: Merge transcripts - already written in order above
+        logger.info(f"🔗 Merging {completed_count} chunk transcripts...")
+        full_transcript = transcript_buffer.getvalue()
+        transcript_buffer.close()
+        logger.info(f"✅ Merged transcript: {len(full_transcript)} chars")
 
         # Step 5: Generate AI content (70-90%)
-
-        # 5a: Summary (70-80%) - needs full transcript, must run first
-        update_job_progress(job_id, 70, "Generating summary...")
-        summary = generate_summary(full_transcript)
-        update_job_progress(job_id, 80, "Summary generated")
-
-        # 5b: Overview + Actions in PARALLEL (80-90%) - both only need summary
-        print(f"   🚀 Generating overview and actions in parallel...")
-        update_job_progress(job_id, 80, "Generating overview and extracting actions...")
-
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            overview_future = executor.submit(generate_overview, summary)
-            actions_future = executor.submit(extract_actions, summary)
-
-            overview = overview_future.result()
-            actions = actions_future.result()
-
-        update_job_progress(job_id, 90, "AI content generated")
-
-        # Step 6: Save results (90-100%)
-        print(f"   💾 Saving all results to database...")
-        update_job_progress(job_id, 95, "Saving results...")
+        # Summary (70-80%), then overview + actions in parallel (80-90%)
+        try:
+            summary, overview, actions = await generate_ai_content(progress, full_transcript, 70, 80)
+        except Exception:
+            # Keep the saved chunk transcripts for the retry, report the AI error
+            await asyncio.gather(final_flush, return_exceptions=True)
+            raise
+        # Results (100%) must land after the flush's 70% progress write
+        await final_flush
+
+        # Step 6: Save results (100%, written together with the results)
+        logger.info("💾 Saving all results to database...")
+        await progress.aclose()
 
         # Use duration from job if available, otherwise calculate from chunks
         duration = job.get("duration")
         if not duration:
             duration = sum(chunk.get("duration_seconds", 0) for chunk in chunks)
 
-        update_job_with_results(
+        await asyncio.to_thread(
+            update_job_with_results,
             job_id=job_id,
             transcript=full_transcript,
             overview=overview,
@@ -530,118 +994,101 @@ def process_chunked_job(job: Dict[str, Any]):
             duration=duration
         )
 
-        print(f"✅ Chunked job {job_id} completed successfully!")
-        print(f"   - Chunks processed: {len(chunks)}")
-        print(f"   - Total transcript: {len(full_transcript)} chars")
-        print(f"   - Overview: {overview[:80]}...")
-        print(f"   - Summary: {len(summary)} chars")
-        print(f"   - Actions: {len(actions)} items")
+        if CLEAR_CHUNK_TRANSCRIPTS:
+            await asyncio.to_thread(clear_chunk_transcripts, meeting_id)
+
+        logger.info(f"✅ Chunked job {job_id} completed successfully!")
+        logger.info(f"- Chunks processed: {len(chunks)}")
+        logger.info(f"- Total transcript: {len(full_transcript)} chars")
+        logger.info(f"- Overview: {overview[:80]}...")
+        logger.info(f"- Summary: {len(summary)} chars")
+        logger.info(f"- Actions: {len(actions)} items")
 
     except Exception as e:
         # Error handling: classify error and decide whether to retry or fail permanently
         error_message = str(e)
         retry_count = job.get("retry_count", 0) or 0
+        await progress.aclose()
 
         try:
             if is_retryable_error(e) and retry_count < MAX_RETRY_ATTEMPTS:
                 # Retryable error - queue for retry
-                print(f"🔄 Chunked job {job_id} failed with retryable error (attempt {retry_count + 1}/{MAX_RETRY_ATTEMPTS}): {error_message}")
-                increment_retry_count(job_id, error_message)
-                print(f"   📋 Job queued for retry on next cron run")
+                logger.warning(f"🔄 Chunked job {job_id} failed with retryable error (attempt {retry_count + 1}/{MAX_RETRY_ATTEMPTS}): {error_message}")
+                await asyncio.to_thread(increment_retry_count, job_id, error_message)
+                logger.info("📋 Job queued for retry on next cron run")
             else:
                 # Permanent error or max retries exceeded
                 if retry_count >= MAX_RETRY_ATTEMPTS:
-                    print(f"❌ Chunked job {job_id} failed permanently after {MAX_RETRY_ATTEMPTS} attempts: {error_message}")
+                    logger.error(f"❌ Chunked job {job_id} failed permanently after {MAX_RETRY_ATTEMPTS} attempts: {error_message}")
                     error_message = f"Max retries ({MAX_RETRY_ATTEMPTS}) exceeded. Last error: {error_message}"
                 else:
-                    print(f"❌ Chunked job {job_id} failed with permanent error: {error_message}")
+                    logger.error(f"❌ Chunked job {job_id} failed with permanent error: {error_message}")
 
-                update_job_status(job_id=job_id, status="failed", error=error_message)
-                update_job_progress(job_id, 0, f"Failed: {error_message[:50]}...")
-                print(f"   💾 Error saved to database")
+                await asyncio.to_thread(fail_job, job_id, error_message)
+                logger.info("💾 Error saved to database")
         except Exception as update_error:
-            print(f"   ⚠️  Failed to update job status: {update_error}")
+            logger.warning(f"⚠️  Failed to update job status: {update_error}")
 
 
-def process_job(job: Dict[str, Any]):
+async def process_job(job: Dict[str, Any]):
     """
-    Process a single transcription job with full AI pipeline and progress tracking
+    Process a single (non-chunked) transcription job with full AI pipeline and progress tracking
 
-    Routes to chunked or regular processing based on job type.
+    Chunked jobs are routed to process_chunked_job by process_job_async.
 
     Args:
         job: Job dictionary from Supabase
     """
     job_id = job["id"]
-    is_chunked = job.get("is_chunked", False)
-
-    # Route to appropriate handler
-    if is_chunked:
-        print(f"   🔀 Routing to chunked job processor...")
-        process_chunked_job(job)
-        return
-
-    # Regular (non-chunked) job processing
     audio_url = job["audio_url"]
     language = job.get("language")  # None if not specified (auto-detect)
+    progress = ProgressThrottler(job_id)
 
     try:
-        # Step 1: Update status to 'processing' and set initial progress
-        print(f"   ⚙️  Updating status to 'processing'...")
-        update_job_status(job_id, "processing")
-        update_job_progress(job_id, 0, "Starting job...")
-
-        # Step 2: Download audio (0-10%)
-        print(f"   📥 Downloading audio...")
-        update_job_progress(job_id, 5, "Downloading audio...")
-        audio_data = download_audio(audio_url)
-        update_job_progress(job_id, 10, "Audio downloaded")
+        # Step 1+2: Update status to 'processing' and download audio (0-10%)
+        # The status write and the download hit different services, so overlap them
+        logger.info("⚙️  Updating status to 'processing'...")
+        logger.info("📥 Downloading audio...")
+        progress.mark_sent(5)
+        _, audio_data = await asyncio.gather(
+            asyncio.to_thread(start_job, job_id, 5, "Downloading audio..."),
+            download_audio(audio_url)
+        )
 
         # Step 3: Transcribe using OpenAI Whisper (10-60%)
-        print(f"   🎤 Transcribing audio...")
+        logger.info("🎤 Transcribing audio...")
 
         def transcription_progress(pct: float, stage: str):
-            """Callback to report transcription progress (maps 0-100 to 10-60)"""
+            """Callback to report transcription progress (maps 0-100 to 10-60), runs in the transcription thread"""
             adjusted_pct = 10 + int(pct * 0.5)  # Scale to 10-60% range
-            update_job_progress(job_id, adjusted_pct, stage)
+            progress.report(adjusted_pct, stage)
 
-        result = transcribe_audio(
-            audio_data,
-            "audio.m4a",
-            progress_callback=transcription_progress,
-            language=language
-        )
+        try:
+            result = await asyncio.to_thread(
+                transcribe_audio,
+                audio_data,
+                "audio.m4a",
+                progress_callback=transcription_progress,
+                language=language
+            )
+        finally:
+            audio_data.close()
 
         transcript = result["transcript"]
         duration = result["duration"]
 
-        print(f"   ✅ Transcription complete: {len(transcript)} chars, {duration:.1f}s")
+        logger.info(f"✅ Transcription complete: {len(transcript)} chars, {duration:.1f}s")
 
         # Step 4: Generate AI content (60-90%)
+        # Summary (60-75%), then overview + actions in parallel (75-90%)
+        summary, overview, actions = await generate_ai_content(progress, transcript, 60, 75)
 
-        # 4a: Summary (60-75%) - needs full transcript, must run first
-        update_job_progress(job_id, 60, "Generating summary...")
-        summary = generate_summary(transcript)
-        update_job_progress(job_id, 75, "Summary generated")
-
-        # 4b: Overview + Actions in PARALLEL (75-90%) - both only need summary
-        print(f"   🚀 Generating overview and actions in parallel...")
-        update_job_progress(job_id, 75, "Generating overview and extracting actions...")
-
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            overview_future = executor.submit(generate_overview, summary)
-            actions_future = executor.submit(extract_actions, summary)
-
-            overview = overview_future.result()
-            actions = actions_future.result()
-
-        update_job_progress(job_id, 90, "AI content generated")
+        # Step 5: Update job with all results and status='completed' (100%)
+        logger.info("💾 Saving all results to database...")
 
-        # Step 5: Update job with all results and status='completed' (90-100%)
-        print(f"   💾 Saving all results to database...")
-        update_job_progress(job_id, 95, "Saving results...")
-
-        update_job_with_results(
+        await progress.aclose()
+        await asyncio.to_thread(
+            update_job_with_results,
             job_id=job_id,
             transcript=transcript,
             overview=overview,
@@ -651,95 +1098,304 @@ def process_job(job: Dict[str, Any]):
         )
         # update_job_with_results automatically sets progress to 100% and stage to "Complete"
 
-        print(f"✅ Job {job_id} completed successfully!")
-        print(f"   - Transcript: {len(transcript)} chars")
-        print(f"   - Overview: {overview[:80]}...")
-        print(f"   - Summary: {len(summary)} chars")
-        print(f"   - Actions: {len(actions)} items")
+        logger.info(f"✅ Job {job_id} completed successfully!")
+        logger.info(f"- Transcript: {len(transcript)} chars")
+        logger.info(f"- Overview: {overview[:80]}...")
+        logger.info(f"- Summary: {len(summary)} chars")
+        logger.info(f"- Actions: {len(actions)} items")
 
     except Exception as e:
         # Error handling: classify error and decide whether to retry or fail permanently
         error_message = str(e)
         retry_count = job.get("retry_count", 0) or 0
+        await progress.aclose()
 
         try:
             if is_retryable_error(e) and retry_count < MAX_RETRY_ATTEMPTS:
                 # Retryable error - queue for retry
-                print(f"🔄 Job {job_id} failed with retryable error (attempt {retry_count + 1}/{MAX_RETRY_ATTEMPTS}): {error_message}")
-                increment_retry_count(job_id, error_message)
-                print(f"   📋 Job queued for retry on next cron run")
+                logger.warning(f"🔄 Job {job_id} failed with retryable error (attempt {retry_count + 1}/{MAX_RETRY_ATTEMPTS}): {error_message}")
+                await asyncio.to_thread(increment_retry_count, job_id, error_message)
+                logger.info("📋 Job queued for retry on next cron run")
             else:
                 # Permanent error or max retries exceeded
                 if retry_count >= MAX_RETRY_ATTEMPTS:
-                    print(f"❌ Job {job_id} failed permanently after {MAX_RETRY_ATTEMPTS} attempts: {error_message}")
+                    logger.error(f"❌ Job {job_id} failed permanently after {MAX_RETRY_ATTEMPTS} attempts: {error_message}")
                     error_message = f"Max retries ({MAX_RETRY_ATTEMPTS}) exceeded. Last error: {error_message}"
                 else:
-                    print(f"❌ Job {job_id} failed with permanent error: {error_message}")
-
-                update_job_status(
-                    job_id=job_id,
-                    status="failed",
-                    error=error_message
-                )
-                update_job_progress(job_id, 0, f"Failed: {error_message[:50]}...")
-                print(f"   💾 Error saved to database")
+                    logger.error(f"❌ Job {job_id} failed with permanent error: {error_message}")
+
+                await asyncio.to_thread(fail_job, job_id, error_message)
+                logger.info("💾 Error saved to database")
         except Exception as update_error:
-            print(f"   ⚠️  Failed to update job status: {update_error}")
+            logger.warning(f"⚠️  Failed to update job status: {update_error}")
+
+
+def use_blocking_pool(max_concurrent: int):
+    """
+    Size the running loop's default executor for the worker's blocking calls
+
+    Every asyncio.to_thread() call (Supabase, storage, Whisper) runs on the
+    default executor. Each job uses at most MAX_CONCURRENT_CHUNKS threads for
+    chunk transcription (GLOBAL_CHUNK_CONCURRENCY across all jobs) plus one for
+    its DB writes, so the pool is sized to fit max_concurrent jobs instead of the
+    min(32, cpu_count + 4) default.
+
+    Args:
+        max_concurrent: Maximum number of jobs processed concurrently
+    """
+    global _blocking_pool, _blocking_pool_loop
+
+    loop = asyncio.get_running_loop()
+    max_workers = min(max_concurrent * MAX_CONCURRENT_CHUNKS, GLOBAL_CHUNK_CONCURRENCY) + max_concurrent
+    if _blocking_pool_loop is loop and _blocking_pool._max_workers >= max_workers:
+        return
 
+    # asyncio.run() shuts the default executor down with its loop, so a pool is
+    # only reused on the loop it was installed on
+    old_pool = _blocking_pool if _blocking_pool_loop is loop else None
+    _blocking_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="blocking")
+    _blocking_pool_loop = loop
+    loop.set_default_executor(_blocking_pool)
+    if old_pool is not None:
+        old_pool.shutdown(wait=False)
 
-async def process_pending_jobs(max_concurrent: int = 3):
+
+async def process_pending_jobs(max_concurrent: int = 3) -> int:
     """
     Main function to process all pending transcription jobs in parallel
 
     Args:
         max_concurrent: Maximum number of jobs to process concurrently (default 3)
 
+    Returns:
+        Number of pending jobs claimed (and processed)
+
     For each pending job:
-    1. Update status to 'processing'
+    1. Claim it (status='processing') with claim_pending_job
     2. Download audio from audio_url
     3. Transcribe using OpenAI Whisper
     4. Update job with transcript and status='completed'
     5. Handle errors by marking job as 'failed'
 
-    Jobs are processed in parallel up to max_concurrent limit for better performance.
+    max_concurrent slots each claim and process one job at a time until the
+    queue is empty or PENDING_JOBS_BATCH_SIZE jobs were claimed. Claiming is
+    atomic (FOR UPDATE SKIP LOCKED), so several workers can drain the queue
+    together, and jobs stay pending (claimable elsewhere) until a slot is free.
+
+    Raises:
+        Exception: If claiming fails (e.g. the claim_pending_job RPC is missing),
+            once the jobs already claimed have finished
     """
-    pending_jobs = get_pending_jobs()
+    use_blocking_pool(max_concurrent)
+    claimed: List[str] = []
+    budget = PENDING_JOBS_BATCH_SIZE
+    claim_error: Optional[Exception] = None
+
+    # No batch barrier: as soon as one job finishes its slot claims the next one
+    async def run_slot():
+        nonlocal budget, claim_error
+        while budget > 0 and claim_error is None:
+            budget -= 1
+            try:
+                # Jobs re-queued for retry during this run wait for the next one
+                job = await asyncio.to_thread(claim_pending_job, list(claimed))
+            except Exception as e:
+                # Stop claiming everywhere, but let jobs in flight finish
+                claim_error = e
+                return
+            if job is None:
+                return
+
+            claimed.append(job["id"])
+            try:
+                await process_job_async(job)
+            except Exception as e:
+                # Contain the failure so the task group doesn't cancel the other jobs
+                logger.error(f"❌ Error processing job {job['id']}: {e}")
+
+    async with asyncio.TaskGroup() as task_group:
+        for _ in range(max_concurrent):
+            task_group.create_task(run_slot())
+
+    if claim_error is not None:
+        raise claim_error
+
+    if claimed:
+        logger.info(f"📊 Processed {len(claimed)} job(s), up to {max_concurrent} concurrently")
+    else:
+        logger.info("✨ No pending jobs")
+    return len(claimed)
 
-    if not pending_jobs:
-        return
 
-    print(f"📊 Found {len(pending_jobs)} pending job(s), processing up to {max_concurrent} concurrently")
+async def process_job_async(job: Dict[str, Any]):
+    """
+    Async entry point for a job: routes chunked jobs to process_chunked_job and
+    regular jobs to process_job
+
+    Args:
+        job: Job dictionary from Supabase
+    """
+    job_id = job["id"]
+
+    with job_log_context(job_id):
+        logger.info(f"🔄 [Job {job_id[:8]}] Starting...")
+
+        # Route to appropriate handler
+        if job.get("is_chunked", False):
+            logger.info("🔀 Routing to chunked job processor...")
+            await process_chunked_job(job)
+            return
 
-    # Process jobs in batches of max_concurrent
-    for i in range(0, len(pending_jobs), max_concurrent):
-        batch = pending_jobs[i:i + max_concurrent]
+        await process_job(job)
 
-        print(f"\n🔄 Processing batch of {len(batch)} job(s)...")
 
-        # Process batch in parallel using asyncio.gather
-        tasks = [process_job_async(job) for job in batch]
-        await asyncio.gather(*tasks)
+async def subscribe_realtime_jobs(on_job_id) -> AsyncRealtimeClient:
+    """
+    Subscribe to pending transcription jobs over Supabase Realtime
 
-        if i + max_concurrent < len(pending_jobs):
-            print(f"✅ Batch complete, {len(pending_jobs) - (i + max_concurrent)} job(s) remaining")
+    Used by listen_for_jobs when no direct Postgres connection is configured.
+    Requires transcription_jobs to be in the supabase_realtime publication
+    (migrations/010_realtime_transcription_jobs.sql). Written against the pinned
+    realtime release, whose connect() starts the receive loop itself and whose
+    is_connected property tracks the socket (the 2.0.x releases supabase alone
+    allows do neither).
 
+    Args:
+        on_job_id: Called with the id of every job inserted as, or reset to, pending
 
-async def process_job_async(job: Dict[str, Any]):
+    Returns:
+        Connected realtime client (caller closes it)
     """
-    Async wrapper for process_job to enable parallel processing
+    def on_change(payload):
+        record = payload["data"].get("record")
+        if record and record.get("id"):
+            on_job_id(record["id"])
+
+    realtime_url = f"{SUPABASE_URL.rstrip('/')}/realtime/v1"
+    client = AsyncRealtimeClient(realtime_url, SUPABASE_SERVICE_KEY, auto_reconnect=True)
+    await client.connect()
+
+    channel = client.channel(JOBS_CHANNEL)
+    for event in ("INSERT", "UPDATE"):
+        channel.on_postgres_changes(
+            event,
+            on_change,
+            table="transcription_jobs",
+            schema="public",
+            filter="status=eq.pending"
+        )
+    await channel.subscribe()
+
+    logger.info("👂 Listening for new jobs over Supabase Realtime")
+    return client
+
+
+async def listen_for_jobs(database_url: Optional[str], max_concurrent: int = 3, sweep_interval: int = 60):
+    """
+    Process jobs as soon as they become pending
+
+    With database_url, job ids come from Postgres LISTEN/NOTIFY on JOBS_CHANNEL;
+    without it, from a Supabase Realtime subscription on transcription_jobs.
+    Job ids are queued (once each until claimed) and consumed by max_concurrent
+    workers. A low-frequency get_pending_jobs() sweep picks up anything missed
+    while the listener was disconnected.
+
+    LISTEN requires a direct (or session-mode pooled) Postgres connection: it does
+    not work through a transaction-mode pgbouncer/Supavisor pooler.
 
     Args:
-        job: Job dictionary from Supabase
+        database_url: Postgres connection string, or None to use Supabase Realtime
+        max_concurrent: Maximum number of jobs to process concurrently (default 3)
+        sweep_interval: Seconds between fallback polls for pending jobs (default 60)
     """
-    job_id = job["id"]
-    print(f"\n🔄 [Job {job_id[:8]}] Starting...")
+    queue: asyncio.Queue = asyncio.Queue()
+    queued: set = set()
+
+    def enqueue(job_id: str):
+        # Skip ids already waiting or in flight (notifications and the sweep can overlap)
+        if job_id not in queued:
+            queued.add(job_id)
+            queue.put_nowait(job_id)
+
+    def on_notify(connection, pid, channel, payload):
+        enqueue(payload)
+
+    async def connect():
+        if not database_url:
+            return await subscribe_realtime_jobs(enqueue)
+
+        connection = await asyncpg.connect(database_url)
+        await connection.add_listener(JOBS_CHANNEL, on_notify)
+        logger.info(f"👂 Listening for new jobs on '{JOBS_CHANNEL}'")
+        return connection
+
+    def disconnected(connection) -> bool:
+        if not database_url:
+            return not connection.is_connected
+        return connection.is_closed()
+
+    async def consume():
+        while True:
+            job_id = await queue.get()
+            try:
+                try:
+                    # Claim the job: it may have been picked up since it was queued,
+                    # by this worker or another one
+                    job = await asyncio.to_thread(claim_job, job_id)
+                finally:
+                    # Once claimed (or gone) the id may be queued again, so the
+                    # notification for a retry re-queued mid-processing isn't dropped
+                    queued.discard(job_id)
+                if job:
+                    await process_job_async(job)
+            except Exception as e:
+                logger.error(f"❌ Error processing job {job_id}: {e}")
+            finally:
+                queue.task_done()
+
+    use_blocking_pool(max_concurrent)
+    connection = await connect()
+    consumers = [asyncio.create_task(consume()) for _ in range(max_concurrent)]
 
-    # Run the synchronous process_job in a thread pool to avoid blocking
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(None, process_job, job)
+    try:
+        while True:
+            # Fallback sweep: catches jobs created while we were not listening
+            for job in await asyncio.to_thread(get_pending_jobs):
+                enqueue(job["id"])
+
+            await asyncio.sleep(sweep_interval)
+
+            if disconnected(connection):
+                logger.warning("⚠️ Listener connection lost, reconnecting...")
+                try:
+                    connection = await connect()
+                except Exception as e:
+                    logger.error(f"❌ Failed to reconnect listener (will retry after next sweep): {e}")
+    finally:
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        if not disconnected(connection):
+            await connection.close()
+
+
+def run_event_loop(main):
+    """
+    Run a coroutine to completion, on uvloop when it's installed
+
+    uvloop is a libuv-based drop-in for the default asyncio loop and cuts
+    scheduler overhead for the many concurrent HTTP waits each job makes.
+    It isn't available on Windows, so fall back to asyncio.run there.
+    """
+    if uvloop is not None:
+        return uvloop.run(main)
+    return asyncio.run(main)
 
 
 if __name__ == "__main__":
-    print("🚀 Starting job processor...")
-    process_pending_jobs()
-    print("✅ Job processor finished")
+    from logging_config import setup_logging
+
+    setup_logging()
+    logger.info("🚀 Starting job processor...")
+    run_event_loop(process_pending_jobs())
+    logger.info("✅ Job processor finished")
@@ -0,0 +1,172 @@
+"""
+Logging setup shared by the API and the background worker
+
+Log records are handed to a QueueHandler and written to stderr by a
+QueueListener thread, so the job hot path only enqueues a record and never
+blocks on terminal/pipe I/O. The writer buffers output and only flushes once
+the queue has drained, so a burst of records costs one write syscall instead
+of one per line, without delaying the last line of the burst.
+
+Every record is tagged with the id of the job being processed (see
+job_log_context), so interleaved logs from concurrent jobs can be told apart.
+Set LOG_FORMAT=json for one JSON object per line.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import copy
+import io
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+# Set LOG_LEVEL=WARNING in production to silence per-chunk progress messages
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# "text" (default) or "json"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+
+TEXT_LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] [%(job_id)s] %(message)s"
+
+# Id of the job the current task/thread is working on (asyncio tasks and
+# asyncio.to_thread calls inherit it)
+current_job_id = contextvars.ContextVar("current_job_id", default="-")
+
+_listener = None
+
+
+@contextlib.contextmanager
+def job_log_context(job_id: str):
+    """
+    Tag every log record emitted inside the block with job_id
+
+    Args:
+        job_id: Id of the job being processed
+    """
+    token = current_job_id.set(job_id)
+    try:
+        yield
+    finally:
+        current_job_id.reset(token)
+
+
+class JobIdFilter(logging.Filter):
+    """Stamp records with the current job id before they leave the calling thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "job_id"):
+            record.job_id = current_job_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "job_id": getattr(record, "job_id", "-"),
+            "message": record.getMessage()
+        }
+        # Records from JobQueueHandler carry the traceback pre-formatted in exc_text
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class JobQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that keeps the traceback separate from the message
+
+    The stock prepare() folds the traceback into msg and drops exc_info, so
+    formatters on the listener side can't tell them apart. Here the traceback
+    is formatted on the emitting thread (the traceback itself isn't kept alive
+    in the queue) and stored in exc_text, which both formatters emit.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# Only used for formatException, which doesn't depend on the format string
+_exception_formatter = logging.Formatter()
+
+
+class QueueDrainFlushHandler(logging.StreamHandler):
+    """StreamHandler on a block-buffered stream that flushes when the log queue is empty"""
+
+    def __init__(self, log_queue: queue.SimpleQueue, stream):
+        super().__init__(stream)
+        self.log_queue = log_queue
+
+    def flush(self):
+        # More records are waiting: let them accumulate in the buffer
+        if self.log_queue.empty():
+            super().flush()
+
+    def force_flush(self):
+        super().flush()
+
+
+def setup_logging(level: str = LOG_LEVEL, log_format: str = LOG_FORMAT):
+    """
+    Route all log records through a queue to a background stderr writer
+
+    Safe to call more than once; only the first call installs the handlers.
+
+    Args:
+        level: Root log level name (default from LOG_LEVEL, "INFO")
+        log_format: "text" or "json" (default from LOG_FORMAT, "text")
+    """
+    global _listener
+
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+
+    # stderr is line-buffered; write through our own 64 KiB buffer on its fd instead
+    stream = io.TextIOWrapper(
+        io.BufferedWriter(io.FileIO(sys.stderr.fileno(), "w", closefd=False), 64 * 1024),
+        encoding=sys.stderr.encoding or "utf-8",
+        errors="backslashreplace"
+    )
+    stream_handler = QueueDrainFlushHandler(log_queue, stream)
+    if log_format == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_LOG_FORMAT))
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+    def stop():
+        # Write out anything still queued or buffered on shutdown
+        _listener.stop()
+        stream_handler.force_flush()
+
+    atexit.register(stop)
+
+    root = logging.getLogger()
+    # The filter runs on the emitting thread, where the job id context is set
+    queue_handler = JobQueueHandler(log_queue)
+    queue_handler.addFilter(JobIdFilter())
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    # Per-request HTTP logs from the SDK clients are noise at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -1,21 +1,74 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Header, Depends, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import uvicorn
+import asyncio
 import os
+import time
 import warnings
+from logging_config import setup_logging
+
+# Configure logging before importing modules that log at import time
+setup_logging()
+
 from transcribe import transcribe_audio
 from supabase_client import create_job, get_job
 
 # Suppress pydub regex warnings in Python 3.13+
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pydub")
 
-app = FastAPI(title="SnipNote Transcription Service")
+# orjson (already used for GPT output) serializes job polls and transcripts
+# straight to bytes, several times faster than the stdlib json encoder
+app = FastAPI(title="SnipNote Transcription Service", default_response_class=ORJSONResponse)
 
 # Simple API key authentication for MVP
 # Full JWT/Supabase auth will be added in Phase 4
 API_KEY = os.getenv("API_KEY", "")
 
+# Number of uvicorn worker processes for `python main.py` (the uvicorn CLI
+# reads the same variable for --workers)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# Seconds a fetched job row is reused for GET /jobs/{job_id}. Clients poll every
+# 1-2s while a job runs, so a short TTL collapses repeat polls into one Supabase
+# read without showing noticeably stale progress (0 disables the cache)
+JOB_CACHE_TTL_SECONDS = float(os.getenv("JOB_CACHE_TTL_SECONDS", "2"))
+
+# /transcribe calls allowed to hold an asyncio.to_thread worker at once. A
+# transcription occupies its thread for minutes, so capping them keeps threads
+# free for the short Supabase calls behind /jobs; extra uploads wait their turn
+MAX_CONCURRENT_TRANSCRIPTIONS = int(os.getenv("MAX_CONCURRENT_TRANSCRIPTIONS", "2"))
+_transcription_slots = asyncio.Semaphore(MAX_CONCURRENT_TRANSCRIPTIONS)
+
+# job_id -> (expires_at, row), per worker process
+_job_cache: dict[str, tuple[float, dict]] = {}
+
+
+async def get_job_cached(job_id: str) -> dict | None:
+    """
+    Fetch a job row, reusing a copy fetched in the last JOB_CACHE_TTL_SECONDS
+
+    Missing jobs aren't cached, so a job created by another process shows up
+    on the next poll.
+    """
+    now = time.monotonic()
+    cached = _job_cache.get(job_id)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    job = await asyncio.to_thread(get_job, job_id, JOB_STATUS_COLUMNS)
+
+    if job and JOB_CACHE_TTL_SECONDS > 0:
+        # Drop expired entries now and then so finished jobs don't pile up
+        if len(_job_cache) >= 1000:
+            for key in [key for key, (expires_at, _) in _job_cache.items() if expires_at <= now]:
+                del _job_cache[key]
+        _job_cache[job_id] = (now + JOB_CACHE_TTL_SECONDS, job)
+
+    return job
+
 
 async def verify_api_key(x_api_key: str = Header(None)):
     """
@@ -71,6 +124,10 @@ class JobStatusResponse(BaseModel):
     updated_at: str
     completed_at: str | None = None
 
+# Columns GET /jobs/{job_id} reads, so polls skip internal ones (retry_count,
+# chunks_processed, ...) the response model would drop anyway
+JOB_STATUS_COLUMNS = ",".join(JobStatusResponse.model_fields)
+
 # Allow all origins for testing (will restrict later)
 app.add_middleware(
     CORSMiddleware,
@@ -79,6 +136,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Completed jobs carry the full transcript and summary on every poll; compress
+# anything over 1KB (the small progress responses are sent as-is)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 @app.get("/")
 async def health_check():
     return {"status": "healthy", "service": "snipnote-transcription"}
@@ -101,8 +162,9 @@ async def create_transcription_job(
     - Worker will fetch chunks from database using meeting_id
     """
     try:
-        # Create job in Supabase
-        job = create_job(
+        # Create job in Supabase (blocking client, so off the event loop)
+        job = await asyncio.to_thread(
+            create_job,
             user_id=request.user_id,
             meeting_id=request.meeting_id,
             audio_url=request.audio_url,
@@ -132,12 +194,14 @@ async def get_job_status(
     Returns job details including status, transcript (if completed), and timestamps.
     """
     try:
-        job = get_job(job_id)
+        job = await get_job_cached(job_id)
 
         if not job:
             raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
 
-        return JobStatusResponse(**job)
+        # response_model validates and filters the row once; building the model
+        # here as well would validate it twice per poll
+        return job
     except HTTPException:
         raise
     except Exception as e:
@@ -150,15 +214,17 @@ async def transcribe(
     language: str | None = Form(None)  # Optional ISO-639-1 code (e.g., "en", "it")
 ):
     try:
-        # Read audio file
-        audio_data = await file.read()
-
-        # Transcribe (language=None means auto-detect)
-        result = transcribe_audio(audio_data, file.filename, language=language)
+        # Pass the spooled upload (on disk past 1MB) instead of reading it into
+        # memory, and transcribe in a worker thread so the event loop keeps
+        # serving other requests (language=None means auto-detect)
+        async with _transcription_slots:
+            result = await asyncio.to_thread(transcribe_audio, file.file, file.filename, language=language)
 
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvicorn[standard] already runs on uvloop + httptools; more than one worker
+    # needs the import string so each process builds its own app and clients
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=WEB_CONCURRENCY)
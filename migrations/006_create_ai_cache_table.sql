@@ -0,0 +1,17 @@
+-- Migration: Create ai_cache table for transcript-keyed AI results
+-- Description: Stores summary/overview/actions keyed by a hash of the transcript so
+--              retried or duplicate jobs can skip the GPT-5-mini calls entirely
+-- Author: System
+-- Date: 2026-10-15
+
+CREATE TABLE IF NOT EXISTS ai_cache (
+  transcript_hash TEXT PRIMARY KEY,
+  summary TEXT NOT NULL,
+  overview TEXT NOT NULL,
+  actions JSONB NOT NULL DEFAULT '[]'::jsonb,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Add comments for documentation
+COMMENT ON TABLE ai_cache IS 'Content-addressed cache of AI-generated meeting content, keyed by transcript hash';
+COMMENT ON COLUMN ai_cache.transcript_hash IS 'blake2b (16-byte digest, hex) of the full transcript text';
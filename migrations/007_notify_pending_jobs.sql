@@ -0,0 +1,25 @@
+-- Migration: Notify workers when a job becomes pending
+-- Description: Fires pg_notify('jobs_pending', <job id>) whenever a transcription job is
+--              inserted as pending or reset to pending for a retry, so a listening worker
+--              can start it immediately instead of waiting for the next poll
+-- Author: System
+-- Date: 2026-10-15
+
+CREATE OR REPLACE FUNCTION notify_pending_job()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM pg_notify('jobs_pending', NEW.id::text);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notify_pending_job ON transcription_jobs;
+
+CREATE TRIGGER trg_notify_pending_job
+  AFTER INSERT OR UPDATE OF status ON transcription_jobs
+  FOR EACH ROW
+  WHEN (NEW.status = 'pending')
+  EXECUTE FUNCTION notify_pending_job();
+
+-- Add comments for documentation
+COMMENT ON FUNCTION notify_pending_job IS 'Publishes the id of a newly pending job on the jobs_pending channel';
@@ -0,0 +1,33 @@
+-- Migration: Batched chunk completion
+-- Description: Saves several chunk transcripts and updates the parent job's chunk counter
+--              and progress in one RPC, so chunked jobs write once per batch of chunks
+--              instead of once per chunk
+-- Author: System
+-- Date: 2026-10-15
+
+CREATE OR REPLACE FUNCTION finish_chunks(
+  p_job_id UUID,
+  p_chunks JSONB,
+  p_chunks_processed INTEGER,
+  p_progress INTEGER,
+  p_stage TEXT
+)
+RETURNS VOID AS $$
+BEGIN
+  -- p_chunks: [{"id": "<chunk uuid>", "transcript": "..."}, ...]
+  UPDATE audio_chunks AS c
+  SET transcript = batch.transcript,
+      transcribed = TRUE
+  FROM jsonb_to_recordset(p_chunks) AS batch(id UUID, transcript TEXT)
+  WHERE c.id = batch.id;
+
+  UPDATE transcription_jobs
+  SET chunks_processed = p_chunks_processed,
+      progress_percentage = p_progress,
+      current_stage = p_stage
+  WHERE id = p_job_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Add comments for documentation
+COMMENT ON FUNCTION finish_chunks IS 'Stores a batch of chunk transcripts and updates job chunk count/progress in one call';
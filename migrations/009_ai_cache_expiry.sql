@@ -0,0 +1,23 @@
+-- Migration: Expire old ai_cache entries
+-- Description: The worker ignores cache entries older than AI_CACHE_TTL_DAYS; this adds
+--              an index for that lookup filter and a helper to delete expired rows
+-- Author: System
+-- Date: 2026-10-15
+
+CREATE INDEX IF NOT EXISTS idx_ai_cache_created_at ON ai_cache(created_at);
+
+CREATE OR REPLACE FUNCTION purge_ai_cache(p_max_age INTERVAL DEFAULT INTERVAL '30 days')
+RETURNS INTEGER AS $$
+DECLARE
+  deleted INTEGER;
+BEGIN
+  DELETE FROM ai_cache
+  WHERE created_at < NOW() - p_max_age;
+
+  GET DIAGNOSTICS deleted = ROW_COUNT;
+  RETURN deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Add comments for documentation
+COMMENT ON FUNCTION purge_ai_cache IS 'Deletes ai_cache entries older than p_max_age (run from pg_cron or manually); returns rows removed';
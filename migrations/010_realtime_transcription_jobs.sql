@@ -0,0 +1,7 @@
+-- Migration: Publish transcription_jobs changes over Supabase Realtime
+-- Description: Lets a worker without a direct Postgres connection (no DATABASE_URL)
+--              subscribe to newly pending jobs instead of polling for them
+-- Author: System
+-- Date: 2026-10-15
+
+ALTER PUBLICATION supabase_realtime ADD TABLE transcription_jobs;
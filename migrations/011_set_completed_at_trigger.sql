@@ -0,0 +1,25 @@
+-- Migration: Stamp completed_at in the database
+-- Description: Sets transcription_jobs.completed_at from the database clock when a job
+--              moves to 'completed', so the worker no longer sends its own timestamp
+-- Author: System
+-- Date: 2026-10-15
+
+CREATE OR REPLACE FUNCTION set_completed_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.status = 'completed' AND OLD.status IS DISTINCT FROM 'completed' THEN
+    NEW.completed_at := NOW();
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_set_completed_at ON transcription_jobs;
+
+CREATE TRIGGER trg_set_completed_at
+  BEFORE UPDATE OF status ON transcription_jobs
+  FOR EACH ROW
+  EXECUTE FUNCTION set_completed_at();
+
+-- Add comments for documentation
+COMMENT ON FUNCTION set_completed_at IS 'Sets completed_at to NOW() when a transcription job first moves to completed';
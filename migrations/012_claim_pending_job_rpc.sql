@@ -0,0 +1,37 @@
+-- Migration: Atomic job claiming
+-- Description: Moves a pending transcription job to 'processing' and returns it in one
+--              statement. claim_pending_job takes the oldest one (FOR UPDATE SKIP LOCKED, for
+--              polling workers); claim_job takes a given id (for the listener). Either way a
+--              job is only returned to the one caller whose update moved it out of 'pending',
+--              so cron runs and listeners never start the same job
+-- Author: System
+-- Date: 2026-10-15
+
+CREATE OR REPLACE FUNCTION claim_pending_job(p_exclude UUID[] DEFAULT '{}')
+RETURNS SETOF transcription_jobs AS $$
+  UPDATE transcription_jobs
+  SET status = 'processing'
+  WHERE id = (
+    SELECT id
+    FROM transcription_jobs
+    WHERE status = 'pending'
+      AND NOT (id = ANY(p_exclude))
+    ORDER BY created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING *;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION claim_job(p_id UUID)
+RETURNS SETOF transcription_jobs AS $$
+  UPDATE transcription_jobs
+  SET status = 'processing'
+  WHERE id = p_id
+    AND status = 'pending'
+  RETURNING *;
+$$ LANGUAGE sql;
+
+-- Add comments for documentation
+COMMENT ON FUNCTION claim_job IS 'Claims the given job if it is still pending; returns no row otherwise';
+COMMENT ON FUNCTION claim_pending_job IS 'Claims the oldest pending job not in p_exclude, skipping rows locked by other workers';
@@ -0,0 +1,214 @@
+"""
+Retry policy for OpenAI and Supabase Storage calls
+
+Transient failures (rate limits, 5xx responses, timeouts, dropped connections)
+are retried with exponential backoff plus jitter, honouring the server's
+Retry-After header when it sends one. Everything else (bad audio, auth errors,
+other 4xx responses) is raised immediately so the job-level error handling can
+classify it with is_retryable_error.
+"""
+
+import logging
+import re
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import httpx
+import openai
+from storage3.utils import StorageException
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying (any other 5xx is retried as well)
+TRANSIENT_STATUS_CODES = {408, 409, 425, 429}
+
+# Never sleep longer than this, whatever Retry-After says
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+
+def _response(error: BaseException) -> Optional[httpx.Response]:
+    """Return the HTTP response attached to an OpenAI/httpx error, if any"""
+    if isinstance(error, (openai.APIStatusError, httpx.HTTPStatusError)):
+        return error.response
+    return None
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """Return the HTTP status code of a failed OpenAI, httpx or Storage call"""
+    response = _response(error)
+    if response is not None:
+        return response.status_code
+
+    # storage3 raises StorageException({"statusCode": ..., ...})
+    if isinstance(error, StorageException) and error.args and isinstance(error.args[0], dict):
+        status = error.args[0].get("statusCode")
+        return int(status) if status is not None else None
+
+    return None
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Decide whether a failed call is worth retrying
+
+    Args:
+        error: The exception raised by the call
+
+    Returns:
+        True for connection errors/timeouts, 408/409/425/429 and 5xx responses
+    """
+    # APITimeoutError is a subclass of APIConnectionError
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError)):
+        return True
+
+    status = status_code(error)
+    return status is not None and (status in TRANSIENT_STATUS_CODES or status >= 500)
+
+
+# Error messages that won't be fixed by retrying (bad input, auth, missing files),
+# matched in one pass over the lowercased message
+PERMANENT_ERROR_PATTERN = re.compile("|".join(map(re.escape, [
+    "invalid audio",
+    "invalid file",
+    "unsupported format",
+    "could not decode",
+    "authentication",
+    "unauthorized",
+    "401",
+    "forbidden",
+    "403",
+    "not found",
+    "404",
+    "bad request",
+    "400",
+    "invalid_api_key",
+    "api key",
+    "permission denied",
+    "access denied",
+    "file too large",
+    "exceeds maximum",
+])))
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Determine if an error is retryable (transient) or permanent.
+
+    This is the job-level policy: a job that failed with a retryable error is
+    re-queued (see MAX_RETRY_ATTEMPTS in jobs.py). Unlike is_transient_error,
+    which only lets retry_transient retry individual calls on known-transient
+    failures, unknown errors count as retryable here.
+
+    Retryable errors include:
+    - Rate limits (429)
+    - Server errors (500, 502, 503, 504)
+    - Timeouts
+    - Connection errors
+
+    Permanent errors include:
+    - Invalid audio format
+    - Authentication failures (401, 403)
+    - Bad requests (400)
+    - File not found (404)
+
+    HTTP errors are classified by their status code; anything else by its message.
+
+    Args:
+        error: The exception to classify
+
+    Returns:
+        True if the error is retryable, False if permanent
+    """
+    if is_transient_error(error):
+        return True
+
+    # Any other HTTP status (4xx) is permanent
+    if status_code(error) is not None:
+        return False
+
+    if PERMANENT_ERROR_PATTERN.search(str(error).lower()):
+        return False
+
+    # Default: treat unknown errors as retryable (safer)
+    # This ensures we don't permanently fail on unexpected transient issues
+    return True
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Read the server-requested delay from Retry-After headers
+
+    Supports OpenAI's retry-after-ms as well as the standard Retry-After header
+    (delta-seconds or an HTTP date).
+
+    Returns:
+        Delay in seconds, or None if the error carries no usable header
+    """
+    response = _response(error)
+    if response is None:
+        return None
+
+    retry_after_ms = response.headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = response.headers.get("retry-after")
+    if not retry_after:
+        return None
+
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _wait_retry_after(fallback: Callable) -> Callable:
+    """Wait strategy: Retry-After when present (capped), otherwise the fallback"""
+    def wait(retry_state) -> float:
+        delay = retry_after_seconds(retry_state.outcome.exception())
+        if delay is None:
+            return fallback(retry_state)
+        return min(delay, MAX_RETRY_AFTER_SECONDS)
+    return wait
+
+
+def _log_retry(max_attempts: int) -> Callable:
+    """before_sleep hook matching the worker's retry log lines"""
+    def log(retry_state):
+        error = retry_state.outcome.exception()
+        logger.warning(
+            f"⚠️ Retry {retry_state.attempt_number}/{max_attempts} for {retry_state.fn.__name__} "
+            f"after {retry_state.next_action.sleep:.1f}s: {error}"
+        )
+    return log
+
+
+def retry_transient(max_attempts: int = 5, initial_delay: float = 1.0, max_delay: float = 30.0):
+    """
+    Decorator retrying a function or coroutine on transient errors
+
+    Args:
+        max_attempts: Total attempts including the first call (default 5)
+        initial_delay: First backoff delay in seconds (doubles each retry, plus jitter)
+        max_delay: Upper bound for a single backoff delay in seconds
+
+    The last exception is re-raised unchanged once attempts are exhausted.
+    """
+    return retry(
+        stop=stop_after_attempt(max_attempts),
+        wait=_wait_retry_after(wait_exponential_jitter(initial=initial_delay, max=max_delay)),
+        retry=retry_if_exception(is_transient_error),
+        before_sleep=_log_retry(max_attempts),
+        reraise=True
+    )
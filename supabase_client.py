@@ -1,7 +1,11 @@
+import logging
 import os
 from supabase import create_client, Client
-from typing import Optional, Dict, Any
-from datetime import datetime
+from postgrest.types import ReturnMethod
+from typing import Optional, Dict, Any, List
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
 
 # Initialize Supabase client
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -15,7 +19,16 @@ if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
 # Create Supabase client with service role key (bypasses RLS)
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 
-print(f"✅ Supabase client initialized for: {SUPABASE_URL}")
+logger.info(f"✅ Supabase client initialized for: {SUPABASE_URL}")
+
+# Table handles built once and shared: request builders are stateless (every
+# select/update/insert returns a fresh query), so reusing them is thread-safe
+jobs_table = supabase.table("transcription_jobs")
+chunks_table = supabase.table("audio_chunks")
+ai_cache_table = supabase.table("ai_cache")
+
+# Days an ai_cache entry stays valid (0 disables expiry)
+AI_CACHE_TTL_DAYS = int(os.getenv("AI_CACHE_TTL_DAYS", "30"))
 
 
 def create_job(
@@ -67,27 +80,28 @@ def create_job(
         if language:
             data["language"] = language
 
-        response = supabase.table("transcription_jobs").insert(data).execute()
+        response = jobs_table.insert(data).execute()
 
         if response.data and len(response.data) > 0:
             job = response.data[0]
             job_type = "chunked" if is_chunked else "regular"
-            print(f"✅ Created {job_type} job {job['id']} for user {user_id} (chunks: {total_chunks})")
+            logger.info(f"✅ Created {job_type} job {job['id']} for user {user_id} (chunks: {total_chunks})")
             return job
         else:
             raise Exception("Failed to create job: No data returned")
 
     except Exception as e:
-        print(f"❌ Error creating job: {e}")
+        logger.error(f"❌ Error creating job: {e}")
         raise
 
 
-def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+def get_job(job_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
     """
     Retrieve a transcription job by ID
 
     Args:
         job_id: UUID of the job to retrieve
+        columns: Comma-separated columns to select (default all)
 
     Returns:
         Dict containing job data or None if not found
@@ -96,35 +110,88 @@ def get_job(job_id: str) -> Optional[Dict[str, Any]]:
         Exception: If query fails
     """
     try:
-        response = supabase.table("transcription_jobs").select("*").eq("id", job_id).execute()
+        response = jobs_table.select(columns).eq("id", job_id).execute()
 
         if response.data and len(response.data) > 0:
             return response.data[0]
         else:
-            print(f"⚠️ Job {job_id} not found")
+            logger.warning(f"⚠️ Job {job_id} not found")
             return None
 
     except Exception as e:
-        print(f"❌ Error retrieving job {job_id}: {e}")
+        logger.error(f"❌ Error retrieving job {job_id}: {e}")
         raise
 
 
-def update_job_status(
-    job_id: str,
-    status: str,
-    transcript: Optional[str] = None,
-    duration: Optional[float] = None,
-    error: Optional[str] = None
-) -> Dict[str, Any]:
+def claim_pending_job(exclude: List[str]) -> Optional[Dict[str, Any]]:
     """
-    Update job status and related fields
+    Atomically claim the oldest pending job
+
+    The claim_pending_job RPC sets the job to 'processing' and returns it in one
+    statement, skipping rows other workers are claiming at the same moment, so
+    two workers never start the same job.
 
     Args:
-        job_id: UUID of the job to update
-        status: New status ('pending', 'processing', 'completed', 'failed')
-        transcript: Transcription text (for completed jobs)
-        duration: Audio duration in seconds (for completed jobs)
-        error: Error message (for failed jobs)
+        exclude: Job ids not to claim again (jobs this run already handled and
+            re-queued for retry)
+
+    Returns:
+        Dict containing the claimed job, or None if no job is pending
+
+    Raises:
+        Exception: If the RPC fails
+    """
+    try:
+        response = supabase.rpc("claim_pending_job", {"p_exclude": exclude}).execute()
+
+        if response.data:
+            job = response.data[0]
+            logger.info(f"📋 Claimed job {job['id']}")
+            return job
+        return None
+
+    except Exception as e:
+        logger.error(f"❌ Error claiming pending job: {e}")
+        raise
+
+
+def claim_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Atomically claim a job by id if it is still pending
+
+    The claim_job RPC only moves the job to 'processing' if nobody else has,
+    so of several workers notified about the same job exactly one gets it.
+
+    Args:
+        job_id: UUID of the job to claim
+
+    Returns:
+        Dict containing the claimed job, or None if it is no longer pending
+
+    Raises:
+        Exception: If the RPC fails
+    """
+    try:
+        response = supabase.rpc("claim_job", {"p_id": job_id}).execute()
+
+        if response.data:
+            logger.info(f"📋 Claimed job {job_id}")
+            return response.data[0]
+        return None
+
+    except Exception as e:
+        logger.error(f"❌ Error claiming job {job_id}: {e}")
+        raise
+
+
+def start_job(job_id: str, progress: int, stage: str) -> Dict[str, Any]:
+    """
+    Mark a job as processing and set its initial progress in a single update
+
+    Args:
+        job_id: UUID of the job to start
+        progress: Initial progress percentage (0-100)
+        stage: Human-readable stage description
 
     Returns:
         Dict containing updated job data
@@ -133,32 +200,57 @@ def update_job_status(
         Exception: If update fails
     """
     try:
-        update_data: Dict[str, Any] = {"status": status}
+        update_data = {
+            "status": "processing",
+            "progress_percentage": progress,
+            "current_stage": stage
+        }
+
+        response = jobs_table.update(update_data).eq("id", job_id).execute()
+
+        if response.data and len(response.data) > 0:
+            logger.info(f"✅ Started job {job_id}")
+            return response.data[0]
+        else:
+            raise Exception(f"Failed to start job {job_id}: No data returned")
 
-        if transcript is not None:
-            update_data["transcript"] = transcript
+    except Exception as e:
+        logger.error(f"❌ Error starting job {job_id}: {e}")
+        raise
 
-        if duration is not None:
-            update_data["duration"] = duration
 
-        if error is not None:
-            update_data["error_message"] = error
+def fail_job(job_id: str, error: str) -> Dict[str, Any]:
+    """
+    Mark a job as permanently failed and reset its progress in a single update
 
-        # Set completed_at timestamp when job completes
-        if status == "completed":
-            update_data["completed_at"] = datetime.utcnow().isoformat()
+    Args:
+        job_id: UUID of the job that failed
+        error: Error message to store on the job
 
-        response = supabase.table("transcription_jobs").update(update_data).eq("id", job_id).execute()
+    Returns:
+        Dict containing updated job data
+
+    Raises:
+        Exception: If update fails
+    """
+    try:
+        update_data = {
+            "status": "failed",
+            "error_message": error,
+            "progress_percentage": 0,
+            "current_stage": f"Failed: {error[:50]}..."
+        }
+
+        response = jobs_table.update(update_data).eq("id", job_id).execute()
 
         if response.data and len(response.data) > 0:
-            job = response.data[0]
-            print(f"✅ Updated job {job_id} to status: {status}")
-            return job
+            logger.info(f"✅ Marked job {job_id} as failed")
+            return response.data[0]
         else:
-            raise Exception(f"Failed to update job {job_id}: No data returned")
+            raise Exception(f"Failed to mark job {job_id} as failed: No data returned")
 
     except Exception as e:
-        print(f"❌ Error updating job {job_id}: {e}")
+        logger.error(f"❌ Error marking job {job_id} as failed: {e}")
         raise
 
 
@@ -187,7 +279,7 @@ def update_job_progress(
             "current_stage": stage
         }
 
-        response = supabase.table("transcription_jobs").update(update_data).eq("id", job_id).execute()
+        response = jobs_table.update(update_data).eq("id", job_id).execute()
 
         if response.data and len(response.data) > 0:
             return response.data[0]
@@ -195,7 +287,7 @@ def update_job_progress(
             raise Exception(f"Failed to update job {job_id} progress: No data returned")
 
     except Exception as e:
-        print(f"❌ Error updating job {job_id} progress: {e}")
+        logger.error(f"❌ Error updating job {job_id} progress: {e}")
         raise
 
 
@@ -233,30 +325,30 @@ def update_job_with_results(
             "actions": actions,  # Supabase client handles JSONB conversion automatically
             "duration": duration,
             "progress_percentage": 100,  # Mark as 100% complete
-            "current_stage": "Complete",
-            "completed_at": datetime.utcnow().isoformat()
+            "current_stage": "Complete"  # completed_at is set by trg_set_completed_at
         }
 
-        response = supabase.table("transcription_jobs").update(update_data).eq("id", job_id).execute()
+        response = jobs_table.update(update_data).eq("id", job_id).execute()
 
         if response.data and len(response.data) > 0:
             job = response.data[0]
-            print(f"✅ Updated job {job_id} with complete AI results")
+            logger.info(f"✅ Updated job {job_id} with complete AI results")
             return job
         else:
             raise Exception(f"Failed to update job {job_id}: No data returned")
 
     except Exception as e:
-        print(f"❌ Error updating job {job_id} with results: {e}")
+        logger.error(f"❌ Error updating job {job_id} with results: {e}")
         raise
 
 
-def get_audio_chunks(meeting_id: str) -> list[Dict[str, Any]]:
+def get_audio_chunks(meeting_id: str, columns: str = "*") -> list[Dict[str, Any]]:
     """
     Fetch all audio chunks for a meeting, ordered by chunk_index
 
     Args:
         meeting_id: UUID of the meeting
+        columns: Comma-separated columns to select (default all)
 
     Returns:
         List of audio chunk dictionaries, ordered by chunk_index
@@ -266,85 +358,78 @@ def get_audio_chunks(meeting_id: str) -> list[Dict[str, Any]]:
     """
     try:
         response = (
-            supabase.table("audio_chunks")
-            .select("*")
+            chunks_table
+            .select(columns)
             .eq("meeting_id", meeting_id)
             .order("chunk_index")
             .execute()
         )
 
         if response.data:
-            print(f"✅ Found {len(response.data)} audio chunks for meeting {meeting_id}")
+            logger.info(f"✅ Found {len(response.data)} audio chunks for meeting {meeting_id}")
             return response.data
         else:
-            print(f"⚠️ No audio chunks found for meeting {meeting_id}")
+            logger.warning(f"⚠️ No audio chunks found for meeting {meeting_id}")
             return []
 
     except Exception as e:
-        print(f"❌ Error fetching audio chunks for meeting {meeting_id}: {e}")
+        logger.error(f"❌ Error fetching audio chunks for meeting {meeting_id}: {e}")
         raise
 
 
-def update_chunk_transcript(chunk_id: str, transcript: str) -> Dict[str, Any]:
+def clear_chunk_transcripts(meeting_id: str) -> None:
     """
-    Update a chunk with its transcript and mark as transcribed
+    Drop per-chunk transcripts once the merged transcript is saved on the job
 
-    Args:
-        chunk_id: UUID of the chunk to update
-        transcript: Transcription text for this chunk
+    Chunks stay marked as transcribed. Best-effort: failures are logged and ignored.
 
-    Returns:
-        Dict containing updated chunk data
-
-    Raises:
-        Exception: If update fails
+    Args:
+        meeting_id: UUID of the meeting whose chunks to clear
     """
     try:
-        update_data = {
-            "transcript": transcript,
-            "transcribed": True
-        }
-
-        response = supabase.table("audio_chunks").update(update_data).eq("id", chunk_id).execute()
-
-        if response.data and len(response.data) > 0:
-            chunk = response.data[0]
-            print(f"✅ Updated chunk {chunk_id} with transcript ({len(transcript)} chars)")
-            return chunk
-        else:
-            raise Exception(f"Failed to update chunk {chunk_id}: No data returned")
+        chunks_table.update({"transcript": None}, returning=ReturnMethod.minimal).eq("meeting_id", meeting_id).execute()
+        logger.info(f"🧹 Cleared chunk transcripts for meeting {meeting_id}")
 
     except Exception as e:
-        print(f"❌ Error updating chunk {chunk_id}: {e}")
-        raise
+        logger.warning(f"⚠️ Error clearing chunk transcripts for meeting {meeting_id}: {e}")
 
 
-def update_chunks_processed(job_id: str, chunks_processed: int) -> Dict[str, Any]:
+def finish_chunks(
+    job_id: str,
+    chunks: List[Dict[str, str]],
+    chunks_processed: int,
+    progress: int,
+    stage: str
+) -> None:
     """
-    Update the number of chunks processed for a job
+    Save a batch of chunk transcripts and update job progress in a single round-trip
 
-    Args:
-        job_id: UUID of the job to update
-        chunks_processed: Number of chunks successfully processed
+    Marks every chunk transcribed with its transcript and updates the job's
+    chunks_processed and progress, executed server-side by the finish_chunks RPC.
 
-    Returns:
-        Dict containing updated job data
+    Args:
+        job_id: UUID of the parent job
+        chunks: List of {"id": chunk_id, "transcript": text} for transcribed chunks
+        chunks_processed: Number of chunks successfully processed so far
+        progress: Progress percentage (0-100)
+        stage: Human-readable stage description
 
     Raises:
-        Exception: If update fails
+        Exception: If the RPC fails
     """
     try:
-        update_data = {"chunks_processed": chunks_processed}
-
-        response = supabase.table("transcription_jobs").update(update_data).eq("id", job_id).execute()
+        supabase.rpc("finish_chunks", {
+            "p_job_id": job_id,
+            "p_chunks": chunks,
+            "p_chunks_processed": chunks_processed,
+            "p_progress": progress,
+            "p_stage": stage
+        }).execute()
 
-        if response.data and len(response.data) > 0:
-            return response.data[0]
-        else:
-            raise Exception(f"Failed to update chunks_processed for job {job_id}: No data returned")
+        logger.info(f"✅ Finished {len(chunks)} chunk(s) ({chunks_processed} processed)")
 
     except Exception as e:
-        print(f"❌ Error updating chunks_processed for job {job_id}: {e}")
+        logger.error(f"❌ Error finishing chunks for job {job_id}: {e}")
         raise
 
 
@@ -379,15 +464,82 @@ def increment_retry_count(job_id: str, error_message: str) -> Dict[str, Any]:
             "current_stage": f"Waiting for retry ({new_retry_count}/5)..."
         }
 
-        response = supabase.table("transcription_jobs").update(update_data).eq("id", job_id).execute()
+        response = jobs_table.update(update_data).eq("id", job_id).execute()
 
         if response.data and len(response.data) > 0:
             job = response.data[0]
-            print(f"🔄 Job {job_id} queued for retry (attempt {new_retry_count}/5)")
+            logger.info(f"🔄 Job {job_id} queued for retry (attempt {new_retry_count}/5)")
             return job
         else:
             raise Exception(f"Failed to increment retry count for job {job_id}: No data returned")
 
     except Exception as e:
-        print(f"❌ Error incrementing retry count for job {job_id}: {e}")
+        logger.error(f"❌ Error incrementing retry count for job {job_id}: {e}")
         raise
+
+
+def get_cached_ai_results(transcript_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up previously generated AI content for a transcript
+
+    The cache is best-effort: lookup failures are logged and treated as a miss.
+    Entries older than AI_CACHE_TTL_DAYS are ignored (and overwritten on save).
+
+    Args:
+        transcript_hash: Hash of the full transcript text
+
+    Returns:
+        Dict with summary, overview and actions, or None on a cache miss
+    """
+    try:
+        query = (
+            ai_cache_table
+            .select("summary,overview,actions")
+            .eq("transcript_hash", transcript_hash)
+        )
+        if AI_CACHE_TTL_DAYS > 0:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=AI_CACHE_TTL_DAYS)
+            query = query.gte("created_at", cutoff.isoformat())
+
+        response = query.limit(1).execute()
+
+        if response.data:
+            return response.data[0]
+        return None
+
+    except Exception as e:
+        logger.warning(f"⚠️ Error reading AI cache for {transcript_hash}: {e}")
+        return None
+
+
+def save_ai_results(
+    transcript_hash: str,
+    summary: str,
+    overview: str,
+    actions: list
+) -> None:
+    """
+    Store AI-generated content for a transcript so retries can reuse it
+
+    The cache is best-effort: write failures are logged and ignored.
+
+    Args:
+        transcript_hash: Hash of the full transcript text
+        summary: Comprehensive meeting summary
+        overview: 1-sentence overview
+        actions: List of action items
+    """
+    try:
+        data = {
+            "transcript_hash": transcript_hash,
+            "summary": summary,
+            "overview": overview,
+            "actions": actions,
+            # Refresh the timestamp so an overwritten stale entry gets a new TTL
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+
+        ai_cache_table.upsert(data, on_conflict="transcript_hash").execute()
+
+    except Exception as e:
+        logger.warning(f"⚠️ Error writing AI cache for {transcript_hash}: {e}")
@@ -1,95 +1,490 @@
+import contextvars
 import os
 import io
-import time
-from typing import Callable, Optional, List
-from functools import wraps
+import json
+import logging
+import shutil
+import subprocess
+import tempfile
+import threading
+import httpx
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from typing import BinaryIO, Callable, Iterator, Optional, List, Tuple, Union
 from openai import OpenAI
 from pydub import AudioSegment
+from pydub.utils import get_prober_name
+from retries import retry_transient
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
 
+_client = None
+_client_lock = threading.Lock()
 
-def retry_with_backoff(max_retries: int = 3, base_delay: float = 1.0):
-    """
-    Decorator for retrying functions with exponential backoff.
+# Transcription backend: "openai" (gpt-4o-transcribe API, default) or
+# "faster_whisper" (local CTranslate2 model, for self-hosted GPU/CPU deployments)
+TRANSCRIBE_BACKEND = os.getenv("TRANSCRIBE_BACKEND", "openai").lower()
+
+# faster-whisper settings (only used when TRANSCRIBE_BACKEND=faster_whisper)
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "large-v3")
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "auto")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")  # "int8_float16" on GPU
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "16"))
+
+_local_pipeline = None
+_local_lock = threading.Lock()
+
+# Audio can be passed around as raw bytes or as a (seekable) file object, e.g. a
+# spooled download, so large recordings never have to be fully held in memory
+AudioInput = Union[bytes, BinaryIO]
 
-    Args:
-        max_retries: Maximum number of retry attempts
-        base_delay: Base delay in seconds (doubles each retry)
-    """
-    def decorator(func: Callable):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            last_exception = None
-            for attempt in range(max_retries):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    last_exception = e
-                    if attempt < max_retries - 1:
-                        delay = base_delay * (2 ** attempt)
-                        print(f"   ⚠️ Retry {attempt + 1}/{max_retries} for {func.__name__} after {delay:.1f}s: {e}")
-                        time.sleep(delay)
-                    else:
-                        print(f"   ❌ {func.__name__} failed after {max_retries} attempts: {e}")
-            raise last_exception
-        return wrapper
-    return decorator
 
+def audio_size(audio_data: AudioInput) -> int:
+    """Return the size in bytes of raw audio bytes or a seekable file object"""
+    if isinstance(audio_data, (bytes, bytearray, memoryview)):
+        return len(audio_data)
 
-@retry_with_backoff(max_retries=3, base_delay=2.0)
-def transcribe_chunk_with_retry(chunk_bytes: bytes, chunk_name: str, language: Optional[str] = None) -> str:
+    position = audio_data.tell()
+    size = audio_data.seek(0, io.SEEK_END)
+    audio_data.seek(position)
+    return size
+
+
+def get_client() -> OpenAI:
+    """
+    Return the shared transcription client, creating it on first use
+
+    All transcription threads share one keep-alive HTTP/2 pool, so concurrent
+    chunk uploads reuse TLS connections to OpenAI instead of opening new ones.
+    Idle connections are kept for a minute (httpx drops them after 5s by
+    default), long enough to span the gap between a job's uploads.
+    SDK retries are disabled: transcribe_chunk_with_retry retries transient
+    errors itself.
+    """
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                max_retries=0,
+                http_client=httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60),
+                    timeout=httpx.Timeout(600.0, connect=10.0)
+                )
+            )
+        return _client
+
+
+@retry_transient(initial_delay=2.0)
+def transcribe_chunk_with_retry(chunk_data: AudioInput, chunk_name: str, language: Optional[str] = None) -> str:
     """
     Transcribe a single audio chunk with retry logic.
 
     Args:
-        chunk_bytes: Audio chunk bytes
+        chunk_data: Audio chunk bytes or a seekable file object (streamed to the API)
         chunk_name: Name for the chunk file
         language: Optional language code
 
     Returns:
         Transcript text
     """
-    chunk_file = io.BytesIO(chunk_bytes)
-    chunk_file.name = chunk_name
+    if isinstance(chunk_data, bytes):
+        # httpx writes bytes into the multipart body as-is, without wrapping
+        # them in a file object that is read back in 64KB pieces
+        chunk_file = (chunk_name, chunk_data)
+    elif isinstance(chunk_data, (bytearray, memoryview)):
+        # Other buffers are only accepted as files
+        chunk_file = io.BytesIO(chunk_data)
+        chunk_file.name = chunk_name
+    else:
+        # Rewind so retries re-send the whole file
+        chunk_data.seek(0)
+        chunk_file = (chunk_name, chunk_data)
 
+    # Only the text is used, so skip the JSON envelope
     api_kwargs = {
         "model": "gpt-4o-transcribe",
-        "file": chunk_file
+        "file": chunk_file,
+        "response_format": "text"
     }
     if language:
         api_kwargs["language"] = language
 
-    response = client.audio.transcriptions.create(**api_kwargs)
-    return response.text
+    return get_client().audio.transcriptions.create(**api_kwargs).strip()
+
+
+def get_local_pipeline():
+    """
+    Load the faster-whisper model once and wrap it in a batched pipeline
+
+    The import is deferred so the default OpenAI backend doesn't need
+    faster-whisper (or CTranslate2) installed.
+    """
+    global _local_pipeline
+
+    with _local_lock:
+        if _local_pipeline is None:
+            from faster_whisper import BatchedInferencePipeline, WhisperModel
+
+            logger.info(f"🧠 Loading faster-whisper model '{WHISPER_MODEL}' ({WHISPER_DEVICE}, {WHISPER_COMPUTE_TYPE})...")
+            model = WhisperModel(WHISPER_MODEL, device=WHISPER_DEVICE, compute_type=WHISPER_COMPUTE_TYPE)
+            _local_pipeline = BatchedInferencePipeline(model=model)
+        return _local_pipeline
+
+
+def transcribe_local(audio_data: AudioInput, language: Optional[str] = None) -> dict:
+    """
+    Transcribe audio on-box with faster-whisper batched inference
+
+    The whole recording is decoded once and its speech segments are transcribed
+    WHISPER_BATCH_SIZE at a time, so no size-based chunking is needed.
+
+    Args:
+        audio_data: Raw audio file bytes or a seekable file object
+        language: Optional language code (None for auto-detect)
+
+    Returns:
+        Dict with 'transcript' and 'duration' keys
+    """
+    pipeline = get_local_pipeline()
+
+    if isinstance(audio_data, (bytes, bytearray, memoryview)):
+        audio_file = io.BytesIO(audio_data)
+    else:
+        audio_file = audio_data
+        audio_file.seek(0)
+
+    # One model instance: run one transcription at a time and consume the
+    # segment generator (where decoding actually happens) under the lock
+    with _local_lock:
+        segments, info = pipeline.transcribe(audio_file, language=language, batch_size=WHISPER_BATCH_SIZE)
+        transcript = " ".join(segment.text.strip() for segment in segments)
+
+    return {
+        "transcript": transcript,
+        "duration": info.duration
+    }
+
 
 # Constants matching iOS implementation
 MAX_CHUNK_SIZE_MB = 1.5
 MAX_CHUNK_SIZE_BYTES = int(MAX_CHUNK_SIZE_MB * 1024 * 1024)
 OVERLAP_SECONDS = 2000  # 2 seconds in milliseconds for pydub
 
+# Files up to this size (and MAX_REQUEST_SECONDS long) are sent in a single
+# request; the API rejects uploads over 25 MB, so leave room for the multipart body
+OPENAI_MAX_UPLOAD_BYTES = 24 * 1024 * 1024
+
+# gpt-4o-transcribe rejects audio longer than 1500 seconds
+MAX_REQUEST_SECONDS = 1400
+
+# Upload extension for each ffprobe container format the transcription API accepts
+UPLOAD_EXTENSIONS = {
+    "mp3": "mp3",
+    "mp4": "m4a",
+    "ogg": "ogg",
+    "wav": "wav",
+    "flac": "flac",
+    "webm": "webm",
+}
+
+# Re-encode files too big for a single request to 16 kHz mono Opus before
+# deciding whether to chunk them; speech needs nothing more, and at 24 kbps
+# most recordings then fit in one request (or far fewer chunks)
+COMPRESS_LARGE_FILES = os.getenv("COMPRESS_LARGE_FILES", "true").lower() == "true"
+COMPRESSED_BITRATE = "24k"
+
+# Maximum number of chunks of one large file transcribed concurrently
+TRANSCRIBE_CONCURRENCY = int(os.getenv("TRANSCRIBE_CONCURRENCY", "4"))
+
+# Chunks whose RMS level (as a fraction of full scale) is below this are treated
+# as silence and never sent to the API. Set to 0 to disable the check.
+SILENCE_RMS_THRESHOLD = float(os.getenv("SILENCE_RMS_THRESHOLD", "0.01"))
+
+
+def audio_format(filename: str) -> str:
+    """Return the pydub/ffmpeg format for a filename, defaulting to m4a"""
+    file_format = filename.split('.')[-1].lower()
+    if file_format not in ['mp3', 'm4a', 'mp4', 'wav', 'ogg', 'flac', 'webm']:
+        file_format = 'm4a'  # Default to m4a
+    return file_format
+
+
+def on_disk_path(audio_data: AudioInput) -> Optional[str]:
+    """
+    Return a path other processes can open to read a file object's contents
+
+    Covers named files and spools that rolled over to an (unnamed) temporary
+    file, which are reachable through /proc on Linux. In-memory audio has none.
+    """
+    name = getattr(audio_data, "name", None)
+    if isinstance(name, int):
+        name = f"/proc/{os.getpid()}/fd/{name}"
+    if not isinstance(name, str) or not os.path.isfile(name):
+        return None
+
+    # Make sure everything written so far is visible to the other process
+    audio_data.flush()
+    return name
+
+
+def ffprobe_json(audio_data: AudioInput) -> dict:
+    """
+    Run ffprobe on audio and return its format and stream info
+
+    ffprobe reads the file from disk (the file object's own path when it has
+    one, otherwise a temporary copy), so the audio is never loaded into memory
+    to be piped to it.
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails
+    """
+    command = [get_prober_name(), "-v", "error", "-show_format", "-show_streams", "-of", "json"]
+
+    path = on_disk_path(audio_data)
+    if path is not None:
+        result = subprocess.run(command + [path], check=True, capture_output=True)
+        return json.loads(result.stdout)
+
+    with tempfile.TemporaryDirectory(prefix="probe-") as work_dir:
+        path = os.path.join(work_dir, "source")
+        write_source_file(audio_data, path)
+        result = subprocess.run(command + [path], check=True, capture_output=True)
+    return json.loads(result.stdout)
+
+
+def probe_audio(audio_data: AudioInput, filename: str) -> Tuple[float, Optional[str]]:
+    """
+    Read the audio duration and container format with ffprobe
+
+    Doubles as a pre-flight check: it runs before anything is uploaded, so a
+    file without an audio stream fails fast instead of costing an API call.
+    Falls back to a bitrate estimate (size / 32 kB/s) if the file can't be probed.
+
+    Args:
+        audio_data: Raw audio file bytes or a seekable file object
+        filename: Filename (for logging)
+
+    Returns:
+        Tuple of (duration in seconds, ffprobe format name or None if unknown)
+
+    Raises:
+        ValueError: If the file was probed and contains no audio stream
+    """
+    try:
+        info = ffprobe_json(audio_data)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not probe duration of {filename}, estimating from size: {e}")
+        return audio_size(audio_data) / 32000, None
+
+    if info and not any(stream.get("codec_type") == "audio" for stream in info.get("streams", [])):
+        raise ValueError(f"Invalid audio: {filename} contains no audio stream")
+
+    container = info.get("format", {}) if info else {}
+
+    try:
+        duration = float(container["duration"])
+    except (KeyError, TypeError, ValueError):
+        logger.warning(f"⚠️ No duration in probe of {filename}, estimating from size")
+        duration = audio_size(audio_data) / 32000
+
+    return duration, container.get("format_name")
+
+
+def fits_one_request(file_size_bytes: int, duration: float, format_name: Optional[str], filename: str) -> bool:
+    """
+    Decide whether a file can be transcribed in a single API request
+
+    Anything up to MAX_CHUNK_SIZE_BYTES always is. Bigger files qualify up to
+    OPENAI_MAX_UPLOAD_BYTES and MAX_REQUEST_SECONDS, but only when the probe
+    succeeded (so the duration is real) and the container can be uploaded as-is.
+
+    Args:
+        file_size_bytes: File size in bytes
+        duration: Duration in seconds from probe_audio
+        format_name: ffprobe format name, or None if the probe failed
+        filename: Filename after upload_filename
+
+    Returns:
+        True if no chunking is needed
+    """
+    if file_size_bytes <= MAX_CHUNK_SIZE_BYTES:
+        return True
+
+    return (
+        format_name is not None
+        and filename.rsplit('.', 1)[-1].lower() in UPLOAD_EXTENSIONS.values()
+        and file_size_bytes <= OPENAI_MAX_UPLOAD_BYTES
+        and duration <= MAX_REQUEST_SECONDS
+    )
+
+
+def upload_filename(filename: str, format_name: Optional[str]) -> str:
+    """
+    Give a file the extension of its probed container
+
+    The API and the pydub decoder both go by the extension, and callers don't
+    always know it (the worker names every download audio.m4a). ffprobe lists
+    every name its demuxer handles, e.g. "mov,mp4,m4a,3gp,3g2,mj2".
+
+    Args:
+        filename: Original filename
+        format_name: ffprobe format name, or None to keep the filename
+
+    Returns:
+        Filename whose extension matches the container
+    """
+    for name in (format_name or "").split(","):
+        if name in UPLOAD_EXTENSIONS:
+            return f"{filename.rsplit('.', 1)[0]}.{UPLOAD_EXTENSIONS[name]}"
+    return filename
+
+
+def is_silent(audio_data: AudioInput, filename: str) -> bool:
+    """
+    Cheap in-process silence check used to skip transcription of empty chunks
+
+    Decodes the audio with pydub and compares its RMS level, normalised to
+    full scale, against SILENCE_RMS_THRESHOLD. Best-effort: if the audio can't
+    be decoded it is reported as not silent and transcribed as usual.
+
+    Args:
+        audio_data: Raw audio file bytes or a seekable file object
+        filename: Filename (for format detection)
+
+    Returns:
+        True if the audio is effectively silent
+    """
+    if SILENCE_RMS_THRESHOLD <= 0:
+        return False
+
+    if isinstance(audio_data, (bytes, bytearray, memoryview)):
+        audio_file = io.BytesIO(audio_data)
+    else:
+        audio_file = audio_data
+        audio_file.seek(0)
+
+    try:
+        audio = AudioSegment.from_file(audio_file, format=audio_format(filename))
+    except Exception as e:
+        logger.warning(f"⚠️ Silence check failed for {filename}, transcribing anyway: {e}")
+        return False
 
-def chunk_audio(audio_bytes: bytes, filename: str, progress_callback: Optional[Callable] = None) -> List[bytes]:
+    if len(audio) == 0:
+        return True
+
+    return audio.rms / audio.max_possible_amplitude < SILENCE_RMS_THRESHOLD
+
+
+def plan_chunk_duration_ms(duration_ms: int, file_size_bytes: int) -> int:
+    """
+    Pick the chunk length for a file of the given duration and size
+
+    Estimates the duration that holds about MAX_CHUNK_SIZE_BYTES of the source,
+    but never less than 60 seconds (like iOS).
+
+    Args:
+        duration_ms: Total duration in milliseconds
+        file_size_bytes: Source file size in bytes
+
+    Returns:
+        Chunk duration in milliseconds, excluding overlap
+    """
+    # Integer arithmetic: bytes and milliseconds never need float rounding
+    target_chunk_duration_ms = (MAX_CHUNK_SIZE_BYTES * duration_ms) // max(file_size_bytes, 1)
+
+    # Ensure minimum chunk duration of 60 seconds (like iOS)
+    MIN_CHUNK_DURATION_MS = 60 * 1000
+    return max(target_chunk_duration_ms, MIN_CHUNK_DURATION_MS)
+
+
+def chunk_bounds(duration_ms: int, chunk_duration_ms: int) -> List[Tuple[int, int]]:
+    """
+    Compute every chunk's start and end up front
+
+    Chunks start chunk_duration_ms apart and each one runs OVERLAP_SECONDS past
+    the start of the next (the last one ends with the audio), so the length of
+    the list is the exact number of chunks.
+
+    Args:
+        duration_ms: Total duration in milliseconds
+        chunk_duration_ms: Chunk length from plan_chunk_duration_ms
+
+    Returns:
+        List of (start_ms, end_ms) tuples, end including the overlap
+    """
+    return [
+        (start_ms, min(start_ms + chunk_duration_ms + OVERLAP_SECONDS, duration_ms))
+        for start_ms in range(0, duration_ms, chunk_duration_ms)
+    ]
+
+
+# Re-encoded chunks are 16 kHz mono (the rate the transcription models resample
+# to anyway) MP3 at this bitrate
+CHUNK_BITRATE_KBPS = 32
+
+# ffmpeg raw sample format for each pydub sample width (8-bit WAV is unsigned)
+PCM_FORMATS = {1: "u8", 2: "s16le", 3: "s24le", 4: "s32le"}
+
+
+def encode_pcm_mp3(pcm: memoryview, audio: AudioSegment) -> bytes:
+    """
+    Encode raw PCM samples to a 16 kHz mono MP3 by piping them through ffmpeg
+
+    Args:
+        pcm: Slice of the decoded samples, in the layout of audio
+        audio: Decoded segment the samples come from (rate, channels, width)
+
+    Returns:
+        MP3 file bytes
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails
+    """
+    result = subprocess.run(
+        [AudioSegment.converter, "-v", "error", "-f", PCM_FORMATS[audio.sample_width],
+         "-ar", str(audio.frame_rate), "-ac", str(audio.channels), "-i", "pipe:0",
+         "-ar", "16000", "-ac", "1", "-b:a", f"{CHUNK_BITRATE_KBPS}k",  # Compress to reduce size
+         "-f", "mp3", "pipe:1"],
+        input=pcm,
+        check=True,
+        capture_output=True
+    )
+    return result.stdout
+
+
+def chunk_audio(
+    audio_data: AudioInput,
+    filename: str,
+    progress_callback: Optional[Callable] = None
+) -> Iterator[Tuple[int, int, bytes]]:
     """
     Split audio into chunks of MAX_CHUNK_SIZE_MB with overlap using PyDub
 
     This properly splits audio at frame boundaries preserving file structure.
+    Chunks are yielded as soon as each one is encoded, so they can be uploaded
+    while the rest are still being cut.
 
     Args:
-        audio_bytes: Raw audio file bytes
+        audio_data: Raw audio file bytes or a seekable file object
         filename: Original filename (for format detection)
-        progress_callback: Optional callback(progress_pct: float, stage: str)
+        progress_callback: Optional callback(progress_pct: float, stage: str), only
+            called before the first chunk
 
-    Returns:
-        List of audio chunk bytes
+    Yields:
+        Tuples of (chunk index, total chunks, MP3 chunk bytes)
     """
     # Load audio file
-    audio_file = io.BytesIO(audio_bytes)
+    if isinstance(audio_data, (bytes, bytearray, memoryview)):
+        audio_file = io.BytesIO(audio_data)
+    else:
+        audio_file = audio_data
+        audio_file.seek(0)
 
     # Detect format from filename extension
-    file_format = filename.split('.')[-1].lower()
-    if file_format not in ['mp3', 'm4a', 'wav', 'ogg', 'flac']:
-        file_format = 'm4a'  # Default to m4a
+    file_format = audio_format(filename)
 
     if progress_callback:
         progress_callback(0, "Loading audio file...")
@@ -97,60 +492,188 @@ def chunk_audio(audio_bytes: bytes, filename: str, progress_callback: Optional[C
     # Load audio using pydub
     audio = AudioSegment.from_file(audio_file, format=file_format)
 
-    # Calculate total duration and bitrate
+    # Calculate total duration and chunk length from the size of the encoded
+    # chunks (CHUNK_BITRATE_KBPS bits per millisecond), not of the source
     duration_ms = len(audio)
-    file_size_bytes = len(audio_bytes)
+    chunk_duration_ms = plan_chunk_duration_ms(duration_ms, duration_ms * CHUNK_BITRATE_KBPS // 8)
 
-    # Estimate chunk duration based on file size and duration
-    # We want chunks around MAX_CHUNK_SIZE_BYTES
-    avg_bytes_per_ms = file_size_bytes / duration_ms
-    target_chunk_duration_ms = int(MAX_CHUNK_SIZE_BYTES / avg_bytes_per_ms)
+    bounds = chunk_bounds(duration_ms, chunk_duration_ms)
+    num_chunks = len(bounds)
 
-    # Ensure minimum chunk duration of 60 seconds (like iOS)
-    MIN_CHUNK_DURATION_MS = 60 * 1000
-    chunk_duration_ms = max(target_chunk_duration_ms, MIN_CHUNK_DURATION_MS)
+    if progress_callback:
+        progress_callback(5, f"Splitting audio into {num_chunks} chunk(s)...")
+
+    pcm = memoryview(audio.raw_data)
+
+    for chunk_index, (start_ms, end_ms) in enumerate(bounds):
+        # Encode the chunk's samples straight from a view of the decoded PCM
+        # (no AudioSegment copy, no temporary WAV file)
+        start_byte = start_ms * audio.frame_rate // 1000 * audio.frame_width
+        end_byte = end_ms * audio.frame_rate // 1000 * audio.frame_width
+        yield chunk_index, num_chunks, encode_pcm_mp3(pcm[start_byte:end_byte], audio)
+
+    logger.info(f"✅ Split audio into {num_chunks} chunk(s)")
+
+
+def write_source_file(audio_data: AudioInput, path: str):
+    """Write audio to a file so ffmpeg gets a seekable input (M4A keeps its index at the end)"""
+    with open(path, "wb") as source:
+        if isinstance(audio_data, (bytes, bytearray, memoryview)):
+            source.write(audio_data)
+        else:
+            audio_data.seek(0)
+            shutil.copyfileobj(audio_data, source)
+            audio_data.seek(0)
 
-    chunks = []
-    current_pos_ms = 0
-    chunk_index = 0
 
-    # Estimate total chunks for progress tracking
-    estimated_chunks = max(1, int(duration_ms / chunk_duration_ms))
+def compress_audio(audio_data: AudioInput, filename: str) -> bytes:
+    """
+    Re-encode audio to 16 kHz mono Opus (Ogg) at COMPRESSED_BITRATE with ffmpeg
+
+    The transcription models resample to 16 kHz mono anyway, so this only drops
+    data they'd discard, typically shrinking a recording 4-10x.
+
+    Args:
+        audio_data: Raw audio file bytes or a seekable file object
+        filename: Filename whose extension is kept on the temporary input
+
+    Returns:
+        Ogg/Opus file bytes
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails
+    """
+    extension = filename.rsplit('.', 1)[-1].lower()
+
+    with tempfile.TemporaryDirectory(prefix="compress-") as work_dir:
+        source_path = os.path.join(work_dir, f"source.{extension}")
+        write_source_file(audio_data, source_path)
+
+        result = subprocess.run(
+            [AudioSegment.converter, "-v", "error", "-i", source_path, "-vn", "-ac", "1", "-ar", "16000",
+             "-c:a", "libopus", "-b:a", COMPRESSED_BITRATE, "-application", "voip", "-f", "ogg", "pipe:1"],
+            check=True,
+            capture_output=True
+        )
+
+    return result.stdout
+
+
+def remux_chunks(
+    audio_data: AudioInput,
+    filename: str,
+    duration: float,
+    progress_callback: Optional[Callable] = None
+) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Split audio into chunks of MAX_CHUNK_SIZE_MB with overlap by stream-copying it with ffmpeg
+
+    Unlike chunk_audio nothing is decoded or re-encoded: each chunk is cut from
+    the source at packet boundaries (every audio packet decodes on its own) and
+    written to the same container, so splitting is I/O bound instead of a full
+    transcode. Needs the real duration from probe_audio to plan the cuts; the
+    last chunk simply runs to the end of the file.
+
+    Args:
+        audio_data: Raw audio file bytes or a seekable file object
+        filename: Filename whose extension (see upload_filename) picks the container
+        duration: Probed duration in seconds
+        progress_callback: Optional callback(progress_pct: float, stage: str), only
+            called before the first chunk
+
+    Yields:
+        Tuples of (chunk index, total chunks, chunk bytes in the source container)
+
+    Raises:
+        ValueError: If the container can't be uploaded as-is
+        subprocess.CalledProcessError: If ffmpeg fails to cut a chunk
+    """
+    extension = filename.rsplit('.', 1)[-1].lower()
+    if extension not in UPLOAD_EXTENSIONS.values():
+        raise ValueError(f"Can't stream-copy .{extension} audio into an uploadable container")
+
+    # Planned from the container's duration alone, no samples are touched
+    duration_ms = int(duration * 1000)
+    chunk_duration_ms = plan_chunk_duration_ms(duration_ms, audio_size(audio_data))
+    bounds = chunk_bounds(duration_ms, chunk_duration_ms)
+    num_chunks = len(bounds)
 
     if progress_callback:
-        progress_callback(5, f"Splitting audio into {estimated_chunks} chunk(s)...")
+        progress_callback(5, f"Splitting audio into {num_chunks} chunk(s)...")
 
-    while current_pos_ms < duration_ms:
-        # Calculate chunk boundaries
-        end_pos_ms = min(current_pos_ms + chunk_duration_ms, duration_ms)
+    with tempfile.TemporaryDirectory(prefix="chunks-") as work_dir:
+        # ffmpeg needs a seekable input to jump to each chunk's start
+        source_path = os.path.join(work_dir, f"source.{extension}")
+        write_source_file(audio_data, source_path)
 
-        # Add overlap to the end (except for the last chunk)
-        chunk_end_with_overlap = min(end_pos_ms + OVERLAP_SECONDS, duration_ms)
+        for chunk_index, (start_ms, end_ms) in enumerate(bounds):
+            chunk_path = os.path.join(work_dir, f"chunk_{chunk_index}.{extension}")
 
-        # Extract chunk
-        chunk_audio = audio[current_pos_ms:chunk_end_with_overlap]
+            command = [AudioSegment.converter, "-v", "error", "-y", "-ss", f"{start_ms / 1000:.3f}", "-i", source_path]
+            if chunk_index < num_chunks - 1:
+                # Overlap is included in end_ms; the last chunk runs to EOF
+                command += ["-t", f"{(end_ms - start_ms) / 1000:.3f}"]
+            command += ["-map", "0:a:0", "-c", "copy", chunk_path]
 
-        # Export chunk to bytes
-        chunk_buffer = io.BytesIO()
-        chunk_audio.export(chunk_buffer, format="mp3", bitrate="64k")  # Compress to reduce size
-        chunk_bytes = chunk_buffer.getvalue()
+            subprocess.run(command, check=True, capture_output=True)
 
-        chunks.append(chunk_bytes)
+            with open(chunk_path, "rb") as chunk_file:
+                chunk_bytes = chunk_file.read()
+            os.remove(chunk_path)
 
-        # Report progress
-        if progress_callback:
-            progress_pct = ((chunk_index + 1) / estimated_chunks) * 100
-            progress_callback(
-                min(progress_pct, 100),
-                f"Created chunk {chunk_index + 1}/{estimated_chunks}"
-            )
+            yield chunk_index, num_chunks, chunk_bytes
 
-        # Move to next chunk (without overlap to avoid duplication)
-        current_pos_ms = end_pos_ms
-        chunk_index += 1
+    logger.info(f"✅ Split audio into {num_chunks} chunk(s) without re-encoding")
 
-    print(f"✅ Split audio into {len(chunks)} chunk(s)")
-    return chunks
+
+# Longest overlap between consecutive chunk transcripts that merge_transcripts looks for
+MAX_OVERLAP_CHARS = 200
+
+
+def find_overlap(merged: str, next_transcript: str, max_chars: int = MAX_OVERLAP_CHARS, min_chars: int = 20) -> int:
+    """
+    Find the longest case-insensitive overlap between the end of one transcript and the start of the next
+
+    Runs Knuth-Morris-Pratt over the two max_chars windows once instead of
+    slicing and comparing every candidate length. Each window is case-folded
+    once, a character at a time so indexes still line up with the original
+    text (casefold also equates forms lower() keeps apart, e.g. "ς" and "σ").
+
+    Args:
+        merged: Transcript so far
+        next_transcript: Transcript of the next chunk
+        max_chars: Longest overlap considered
+        min_chars: Overlaps of this length or shorter are ignored as coincidental
+
+    Returns:
+        Overlap length in characters, or 0 if there is none
+    """
+    window = min(max_chars, len(merged), len(next_transcript))
+    if window <= min_chars:
+        return 0
+
+    head = [c.casefold() for c in next_transcript[:window]]
+    tail = [c.casefold() for c in merged[-window:]]
+
+    # failure[i]: length of the longest proper prefix of head[:i + 1] that is also its suffix
+    failure = [0] * window
+    matched = 0
+    for i in range(1, window):
+        while matched and head[i] != head[matched]:
+            matched = failure[matched - 1]
+        if head[i] == head[matched]:
+            matched += 1
+        failure[i] = matched
+
+    # Scan the tail; the final state is the longest prefix of head ending the tail
+    matched = 0
+    for c in tail:
+        while matched and c != head[matched]:
+            matched = failure[matched - 1]
+        if c == head[matched]:
+            matched += 1
+
+    return matched if matched > min_chars else 0
 
 
 def merge_transcripts(transcripts: List[str]) -> str:
@@ -171,36 +694,34 @@ def merge_transcripts(transcripts: List[str]) -> str:
     if not filtered:
         return ""
 
-    merged = filtered[0]
+    # Collect pieces and join once at the end; overlap detection only ever
+    # looks at the last MAX_OVERLAP_CHARS of the text so far
+    pieces = [filtered[0]]
+    tail = filtered[0][-MAX_OVERLAP_CHARS:]
 
     # Merge remaining transcripts with overlap detection
     for i in range(1, len(filtered)):
         next_transcript = filtered[i]
 
-        # Try to find overlap (simple approach: check last 200 chars)
-        overlap_found = False
-        max_overlap_chars = min(200, len(merged), len(next_transcript))
-
-        for overlap_len in range(max_overlap_chars, 20, -1):
-            suffix = merged[-overlap_len:].lower()
-            prefix = next_transcript[:overlap_len].lower()
+        overlap_len = find_overlap(tail, next_transcript)
+        overlap_found = overlap_len > 0
 
-            if suffix == prefix:
-                # Found overlap, merge without duplication
-                merged += next_transcript[overlap_len:]
-                overlap_found = True
-                print(f"   ✂️  Detected {overlap_len} char overlap between chunks {i} and {i+1}")
-                break
-
-        if not overlap_found:
+        if overlap_found:
+            # Found overlap, merge without duplication
+            piece = next_transcript[overlap_len:]
+            logger.info(f"✂️  Detected {overlap_len} char overlap between chunks {i} and {i+1}")
+        else:
             # No overlap found, just append with space
-            merged += " " + next_transcript
+            piece = " " + next_transcript
+
+        pieces.append(piece)
+        tail = (tail + piece)[-MAX_OVERLAP_CHARS:]
 
-    return merged
+    return "".join(pieces)
 
 
 def transcribe_audio(
-    audio_data: bytes,
+    audio_data: AudioInput,
     filename: str,
     progress_callback: Optional[Callable] = None,
     language: Optional[str] = None
@@ -208,8 +729,10 @@ def transcribe_audio(
     """
     Transcribe audio using OpenAI gpt-4o-transcribe with automatic chunking for large files
 
+    With TRANSCRIBE_BACKEND=faster_whisper the audio is transcribed locally instead.
+
     Args:
-        audio_data: Raw audio file bytes
+        audio_data: Raw audio file bytes or a seekable file object
         filename: Original filename
         progress_callback: Optional callback(progress_pct: float, stage: str)
         language: ISO-639-1 language code (e.g., "en", "it"). None for auto-detect
@@ -217,12 +740,47 @@ def transcribe_audio(
     Returns:
         Dict with 'transcript' and 'duration' keys
     """
-    file_size_bytes = len(audio_data)
+    if TRANSCRIBE_BACKEND == "faster_whisper":
+        if progress_callback:
+            progress_callback(0, "Transcribing audio...")
+
+        result = transcribe_local(audio_data, language)
+
+        if progress_callback:
+            progress_callback(100, "Transcription complete")
+
+        return result
+
+    file_size_bytes = audio_size(audio_data)
+
+    # Probe once up front: rejects non-audio before any upload and names the
+    # file after its real container
+    duration, format_name = probe_audio(audio_data, filename)
+    filename = upload_filename(filename, format_name)
+
+    # Too big for one request: compress first, which often makes chunking
+    # unnecessary and otherwise shrinks every chunk upload. Skipped when the
+    # probe failed, since chunking the result needs the real duration
+    one_request = fits_one_request(file_size_bytes, duration, format_name, filename)
+    if COMPRESS_LARGE_FILES and not one_request and format_name is not None:
+        if progress_callback:
+            progress_callback(0, "Compressing audio...")
+
+        try:
+            compressed = compress_audio(audio_data, filename)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not compress {filename}, using the original: {e}")
+        else:
+            logger.info(f"🗜️  Compressed {file_size_bytes / 1024 / 1024:.2f} MB to {len(compressed) / 1024 / 1024:.2f} MB (16 kHz mono Opus)")
+            audio_data = compressed
+            filename = f"{filename.rsplit('.', 1)[0]}.ogg"
+            file_size_bytes = len(compressed)
+            one_request = fits_one_request(file_size_bytes, duration, format_name, filename)
 
     # Check if chunking is needed
-    if file_size_bytes <= MAX_CHUNK_SIZE_BYTES:
-        # Small file - direct transcription (fast path)
-        print(f"📄 File size: {file_size_bytes / 1024 / 1024:.2f} MB - using direct transcription")
+    if one_request:
+        # Fits in one request - direct transcription (fast path)
+        logger.info(f"📄 File size: {file_size_bytes / 1024 / 1024:.2f} MB - using direct transcription")
 
         if progress_callback:
             progress_callback(0, "Transcribing audio...")
@@ -230,9 +788,6 @@ def transcribe_audio(
         # Use retry-enabled transcription
         transcript_text = transcribe_chunk_with_retry(audio_data, filename, language)
 
-        # Calculate duration (rough estimate)
-        duration = len(audio_data) / 32000
-
         if progress_callback:
             progress_callback(100, "Transcription complete")
 
@@ -243,40 +798,101 @@ def transcribe_audio(
 
     else:
         # Large file - use chunking
-        print(f"📦 File size: {file_size_bytes / 1024 / 1024:.2f} MB - using chunked transcription")
+        logger.info(f"📦 File size: {file_size_bytes / 1024 / 1024:.2f} MB - using chunked transcription")
 
-        # Split into chunks (progress: 0-10%)
+        # Split into chunks (progress: 0-10%, until the first chunk is ready)
         def chunk_progress(pct, stage):
             if progress_callback:
                 progress_callback(pct * 0.1, stage)
 
-        chunks = chunk_audio(audio_data, filename, chunk_progress)
-
-        # Transcribe each chunk (progress: 10-90%)
-        transcripts = []
-        total_chunks = len(chunks)
-
-        for i, chunk_bytes in enumerate(chunks):
+        chunk_extension = "mp3"
+
+        def cut_chunks() -> Iterator[Tuple[int, int, bytes]]:
+            """
+            Cut the source without re-encoding when the probe gave a real duration
+            and container; otherwise (or if ffmpeg can't copy it) decode and
+            re-encode to MP3 with pydub
+            """
+            nonlocal chunk_extension
+            if format_name is not None:
+                produced = False
+                try:
+                    chunk_extension = filename.rsplit('.', 1)[-1].lower()
+                    for chunk in remux_chunks(audio_data, filename, duration, chunk_progress):
+                        produced = True
+                        yield chunk
+                    return
+                except Exception as e:
+                    # Chunks already handed out can't be taken back
+                    if produced:
+                        raise
+                    logger.warning(f"⚠️ Stream-copy split failed for {filename}, re-encoding instead: {e}")
+
+            chunk_extension = "mp3"
+            yield from chunk_audio(audio_data, filename, chunk_progress)
+
+        # Transcribe chunks concurrently (progress: 10-90%) while the rest are
+        # still being cut. Each request is a network round-trip, so up to
+        # TRANSCRIBE_CONCURRENCY run at once on the shared client, and at most
+        # two more chunks wait in memory; results are kept in chunk order for merging.
+        total_chunks = 0
+        transcripts: List[Optional[str]] = []
+        completed = 0
+        progress_lock = threading.Lock()
+        in_flight = threading.Semaphore(TRANSCRIBE_CONCURRENCY + 2)
+        failed = threading.Event()
+
+        def transcribe_one(i: int, chunk_bytes: bytes, chunk_name: str):
+            nonlocal completed
             chunk_num = i + 1
+            logger.info(f"🎤 Transcribing chunk {chunk_num}/{total_chunks} ({len(chunk_bytes) / 1024 / 1024:.2f} MB)")
 
-            if progress_callback:
-                base_progress = 10 + ((i / total_chunks) * 80)
-                progress_callback(base_progress, f"Transcribing chunk {chunk_num}/{total_chunks}...")
-
-            print(f"   🎤 Transcribing chunk {chunk_num}/{total_chunks} ({len(chunk_bytes) / 1024 / 1024:.2f} MB)")
-
-            # Transcribe chunk with retry logic
             try:
-                transcript_text = transcribe_chunk_with_retry(
-                    chunk_bytes,
-                    f"chunk_{chunk_num}.mp3",
-                    language
-                )
-                transcripts.append(transcript_text)
-                print(f"   ✅ Chunk {chunk_num} transcribed: {len(transcript_text)} chars")
+                transcript_text = transcribe_chunk_with_retry(chunk_bytes, chunk_name, language)
             except Exception as e:
-                print(f"   ❌ Chunk {chunk_num} failed after retries: {e}")
-                raise  # Fail completely if any chunk fails after retries
+                logger.error(f"❌ Chunk {chunk_num} failed after retries: {e}")
+                failed.set()
+                raise
+            finally:
+                in_flight.release()
+
+            transcripts[i] = transcript_text
+            logger.info(f"✅ Chunk {chunk_num} transcribed: {len(transcript_text)} chars")
+
+            with progress_lock:
+                completed += 1
+                if progress_callback:
+                    progress_callback(10 + (completed / total_chunks) * 80, f"Transcribed {completed}/{total_chunks} chunks...")
+
+        with ThreadPoolExecutor(max_workers=TRANSCRIBE_CONCURRENCY, thread_name_prefix="transcribe") as pool, \
+                closing(cut_chunks()) as chunks:
+            futures = []
+            try:
+                for i, num_chunks, chunk_bytes in chunks:
+                    if not futures:
+                        total_chunks = num_chunks
+                        transcripts = [None] * total_chunks
+                        if progress_callback:
+                            progress_callback(10, f"Transcribing {total_chunks} chunks...")
+
+                    # Stop cutting once a chunk has failed; wait while the pool is busy
+                    in_flight.acquire()
+                    if failed.is_set():
+                        in_flight.release()
+                        break
+
+                    # Run each chunk in a copy of the caller's context so logs keep the job id
+                    futures.append(pool.submit(
+                        contextvars.copy_context().run, transcribe_one, i, chunk_bytes, f"chunk_{i + 1}.{chunk_extension}"
+                    ))
+
+                # Fail completely if any chunk fails after retries
+                for future in as_completed(futures):
+                    future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
 
         # Merge transcripts (progress: 90-100%)
         if progress_callback:
@@ -284,13 +900,10 @@ def transcribe_audio(
 
         full_transcript = merge_transcripts(transcripts)
 
-        # Calculate duration estimate
-        duration = len(audio_data) / 32000
-
         if progress_callback:
             progress_callback(100, "Transcription complete")
 
-        print(f"✅ Full transcript: {len(full_transcript)} chars from {total_chunks} chunks")
+        logger.info(f"✅ Full transcript: {len(full_transcript)} chars from {total_chunks} chunks")
 
         return {
             "transcript": full_transcript,
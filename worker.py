@@ -11,14 +11,26 @@ For Render cron job:
 
 For continuous mode:
     python worker.py --continuous
+
+For push mode (starts jobs on Postgres NOTIFY with DATABASE_URL, otherwise
+on Supabase Realtime changes):
+    python worker.py --listen
 """
 
-import time
+import logging
 import sys
 import warnings
 import os
 import asyncio
-from jobs import process_pending_jobs
+import random
+from logging_config import setup_logging
+
+# Configure logging before importing jobs so import-time messages aren't dropped
+setup_logging()
+
+from jobs import process_pending_jobs, listen_for_jobs, run_event_loop
+
+logger = logging.getLogger(__name__)
 
 # Suppress pydub regex warnings in Python 3.13+
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pydub")
@@ -27,40 +39,94 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pydub")
 # With 2GB RAM, you can safely handle 3-5 concurrent jobs
 MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "3"))
 
+# Continuous mode polls again after MIN_POLL_INTERVAL seconds while jobs keep
+# arriving and backs off (x1.5 per empty poll) to the --continuous interval when idle
+MIN_POLL_INTERVAL = float(os.getenv("MIN_POLL_INTERVAL", "2"))
+
+# Direct Postgres connection string for --listen mode (LISTEN needs a session,
+# so use the direct/session-mode port, not the transaction pooler)
+DATABASE_URL = os.getenv("DATABASE_URL")
+
 
 def run_once():
     """
     Run worker once: process all pending jobs and exit
     Processes up to MAX_CONCURRENT_JOBS in parallel for better performance
     """
-    print(f"🚀 Starting transcription worker (single run, max {MAX_CONCURRENT_JOBS} concurrent)...")
-    asyncio.run(process_pending_jobs(max_concurrent=MAX_CONCURRENT_JOBS))
-    print("✅ Worker finished\n")
+    logger.info(f"🚀 Starting transcription worker (single run, max {MAX_CONCURRENT_JOBS} concurrent)...")
+    run_event_loop(process_pending_jobs(max_concurrent=MAX_CONCURRENT_JOBS))
+    logger.info("✅ Worker finished")
+
+
+async def _poll_forever(interval_seconds: int):
+    """
+    Poll for pending jobs forever on a single event loop
+
+    The shared AsyncOpenAI client keeps its connection pool bound to the loop it
+    first ran on, so every poll must reuse the same loop. The wait between polls
+    starts at MIN_POLL_INTERVAL, grows by half after every empty poll up to
+    interval_seconds and resets as soon as a job shows up; up to 10% jitter keeps
+    several workers from polling in lockstep. A failed poll (e.g. Supabase
+    unreachable) is logged and backed off like an empty one.
+    """
+    delay = MIN_POLL_INTERVAL
+    while True:
+        try:
+            processed = await process_pending_jobs(max_concurrent=MAX_CONCURRENT_JOBS)
+        except Exception as e:
+            logger.error(f"❌ Error polling for pending jobs: {e}")
+            processed = 0
+        delay = MIN_POLL_INTERVAL if processed else min(delay * 1.5, interval_seconds)
+        logger.debug(f"⏰ Waiting {delay:.1f}s before next check...")
+        await asyncio.sleep(delay + random.uniform(0, delay * 0.1))
 
 
 def run_continuous(interval_seconds: int = 60):
     """
-    Run worker continuously: check for pending jobs every N seconds
+    Run worker continuously: check for pending jobs, more often while busy
 
     Args:
-        interval_seconds: Time to wait between checks (default 60)
+        interval_seconds: Longest wait between checks when idle (default 60)
     """
-    print(f"🚀 Starting transcription worker (continuous mode, max {MAX_CONCURRENT_JOBS} concurrent, checking every {interval_seconds}s)...")
-    print("   Press Ctrl+C to stop\n")
+    logger.info(f"🚀 Starting transcription worker (continuous mode, max {MAX_CONCURRENT_JOBS} concurrent, checking every {MIN_POLL_INTERVAL:g}-{interval_seconds}s)...")
+    logger.info("Press Ctrl+C to stop")
+
+    try:
+        run_event_loop(_poll_forever(interval_seconds))
+    except KeyboardInterrupt:
+        logger.info("👋 Worker stopped by user")
+        sys.exit(0)
+
+
+def run_listen(sweep_interval: int = 60):
+    """
+    Run worker in push mode: start jobs as soon as Postgres notifies us
+
+    Uses Postgres LISTEN/NOTIFY when DATABASE_URL is set and Supabase Realtime
+    otherwise. Falls back to a get_pending_jobs() sweep every sweep_interval seconds.
+
+    Args:
+        sweep_interval: Time between fallback polls (default 60)
+    """
+    if not DATABASE_URL:
+        logger.info("ℹ️ DATABASE_URL is not set, listening over Supabase Realtime")
+
+    logger.info(f"🚀 Starting transcription worker (listen mode, max {MAX_CONCURRENT_JOBS} concurrent, sweeping every {sweep_interval}s)...")
+    logger.info("Press Ctrl+C to stop")
 
     try:
-        while True:
-            asyncio.run(process_pending_jobs(max_concurrent=MAX_CONCURRENT_JOBS))
-            print(f"⏰ Waiting {interval_seconds}s before next check...")
-            time.sleep(interval_seconds)
+        run_event_loop(listen_for_jobs(DATABASE_URL, max_concurrent=MAX_CONCURRENT_JOBS, sweep_interval=sweep_interval))
     except KeyboardInterrupt:
-        print("\n👋 Worker stopped by user")
+        logger.info("👋 Worker stopped by user")
         sys.exit(0)
 
 
 if __name__ == "__main__":
     # Check command line arguments
-    if len(sys.argv) > 1 and sys.argv[1] == "--continuous":
+    if len(sys.argv) > 1 and sys.argv[1] == "--listen":
+        # Push mode for an always-on background worker
+        run_listen(sweep_interval=60)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--continuous":
         # Continuous mode for local testing
         run_continuous(interval_seconds=60)
     else: